@@ -15,8 +15,10 @@ Extracted baselines
   rest, so the posture detector doesn't penalise a person's natural tilt.
 - **head_yaw_baseline_deg**: head yaw at neutral (looking straight) —
   accounts for off-center camera placement.
-- **clothing_hsv_ranges**: dominant HSV colour ranges near the shoulder
-  region, used as a fallback colour cue when Pose detection drops out.
+- **clothing_hsv_left** / **clothing_hsv_right**: dominant HSV colour
+  clusters near each shoulder, one ``{h_mean, s_mean, v_mean, h_std,
+  s_std, v_std, pixel_count}`` dict per cluster, most populated first.
+  Stored for a fallback colour cue when Pose detection drops out.
 - **skin_hsv_mean**: average HSV of visible skin (forehead area), used to
   verify face presence when FaceMesh confidence is borderline.
 """
@@ -25,6 +27,9 @@ from __future__ import annotations
 
 import logging
 import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -37,10 +42,23 @@ logger = logging.getLogger("uvicorn.error")
 _AVG_FACE_WIDTH_M = 0.15
 # Assumed horizontal field-of-view for a typical laptop webcam (degrees).
 _ASSUMED_HFOV_DEG = 60.0
+_TAN_HALF_ASSUMED_HFOV = math.tan(math.radians(_ASSUMED_HFOV_DEG / 2.0))
 # Optimal distance range for body-language analysis (metres).
 OPTIMAL_DISTANCE_MIN_M = 0.5
 OPTIMAL_DISTANCE_MAX_M = 1.0
 
+# Pose / FaceMesh resize internally to ~256 px, so larger inputs only cost
+# extra conversion and downscale work.  Landmarks are normalised, so running
+# inference on a smaller copy does not change downstream maths.
+_MAX_INFERENCE_DIM = 1024
+
+# Coarse HSV histogram used to find dominant clothing colours.  OpenCV hue
+# spans 0–179 and saturation / value span 0–255.
+_HUE_BINS = 12
+_SV_BINS = 8
+_HUE_BIN_WIDTH = 180 // _HUE_BINS
+_SV_BIN_WIDTH = 256 // _SV_BINS
+
 
 def _estimate_distance(
     face_width_ratio: float,
@@ -59,8 +77,11 @@ def _estimate_distance(
     """
     if face_width_ratio <= 0:
         return 0.0
-    half_fov_rad = math.radians(hfov_deg / 2.0)
-    return face_width_m / (2.0 * face_width_ratio * math.tan(half_fov_rad))
+    if hfov_deg == _ASSUMED_HFOV_DEG:
+        tan_half_fov = _TAN_HALF_ASSUMED_HFOV
+    else:
+        tan_half_fov = math.tan(math.radians(hfov_deg / 2.0))
+    return face_width_m / (2.0 * face_width_ratio * tan_half_fov)
 
 
 def _distance_feedback(
@@ -103,16 +124,16 @@ def _iris_horizontal_ratio(
 
 
 def _head_yaw_from_face_landmarks(face_landmarks) -> float:
-    nose = face_landmarks[1]
-    left = face_landmarks[234]
-    right = face_landmarks[454]
-    d_left = abs(nose.x - left.x)
-    d_right = abs(nose.x - right.x)
+    nose_x, left_x, right_x = face_landmarks[1].x, face_landmarks[234].x, face_landmarks[454].x
+    d_left = nose_x - left_x if nose_x > left_x else left_x - nose_x
+    d_right = nose_x - right_x if nose_x > right_x else right_x - nose_x
     total = d_left + d_right
     if total < 1e-6:
         return 0.0
+    # |d_right - d_left| <= total, so only float rounding can push this past ±1.
     ratio = (d_right - d_left) / total
-    return math.degrees(math.asin(max(-1.0, min(1.0, ratio))))
+    ratio = 1.0 if ratio > 1.0 else (-1.0 if ratio < -1.0 else ratio)
+    return math.degrees(math.asin(ratio))
 
 
 def _extract_region_hsv_ranges(
@@ -124,46 +145,132 @@ def _extract_region_hsv_ranges(
     *,
     k_clusters: int = 2,
 ) -> list[dict]:
-    """Return dominant HSV colour ranges for a rectangular region."""
+    """Return dominant HSV colour ranges for a rectangular region.
+
+    Pixels are binned into a coarse 12x8x8 HSV histogram and the
+    ``k_clusters`` most populated bins are reported — a single vectorised
+    pass instead of iterative k-means refinement.
+    """
     import numpy as np
     region = hsv_image[y_start:y_end, x_start:x_end]
     if region.size == 0:
         return []
 
-    pixels = region.reshape(-1, 3).astype(np.float32)
+    # Stay in uint8: binning and bincount weights need no float copy.
+    pixels = region.reshape(-1, 3)
+    k = min(k_clusters, len(pixels))
+    if k < 1:
+        return []
 
+    bins = (
+        (pixels[:, 0] // _HUE_BIN_WIDTH).astype(np.intp) * _SV_BINS
+        + (pixels[:, 1] // _SV_BIN_WIDTH).astype(np.intp)
+    ) * _SV_BINS + (pixels[:, 2] // _SV_BIN_WIDTH).astype(np.intp)
+    n_bins = _HUE_BINS * _SV_BINS * _SV_BINS
+    counts = np.bincount(bins, minlength=n_bins)
+
+    k = min(k, int(np.count_nonzero(counts)))
+    top_bins = np.argpartition(counts, -k)[-k:]
+    top_bins = top_bins[np.argsort(counts[top_bins])[::-1]]
+
+    # Per-bin first and second moments in one pass per channel, so no masked
+    # copy of the cluster pixels is ever materialised.
+    sums = np.stack(
+        [np.bincount(bins, weights=pixels[:, c], minlength=n_bins)[top_bins] for c in range(3)],
+        axis=1,
+    )
+    sq_sums = np.stack(
+        [
+            np.bincount(
+                bins, weights=np.square(pixels[:, c], dtype=np.uint32), minlength=n_bins
+            )[top_bins]
+            for c in range(3)
+        ],
+        axis=1,
+    )
+    top_counts = counts[top_bins]
+    means = sums / top_counts[:, None]
+    stds = np.sqrt(np.maximum(sq_sums / top_counts[:, None] - np.square(means), 0.0))
+
+    ranges = []
+    for (h_mean, s_mean, v_mean), (h_std, s_std, v_std), count in zip(means, stds, top_counts):
+        ranges.append({
+            "h_mean": round(float(h_mean), 1),
+            "s_mean": round(float(s_mean), 1),
+            "v_mean": round(float(v_mean), 1),
+            "h_std": round(float(h_std), 1),
+            "s_std": round(float(s_std), 1),
+            "v_std": round(float(v_std), 1),
+            "pixel_count": int(count),
+        })
+    return ranges
+
+
+# MediaPipe solution graphs are expensive to build but not thread-safe, so
+# each worker thread keeps its own long-lived instances.  Pose and FaceMesh
+# run side by side on a small persistent pool so the per-thread solutions
+# survive between calibration requests.
+_solutions = threading.local()
+_INFERENCE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="calibration")
+
+
+def _pose_model_complexity() -> int:
+    """Calibration only needs coarse shoulder positions, so the lite model
+    (0) is the default; set ``CALIBRATION_POSE_COMPLEXITY`` to 1 or 2 to
+    trade latency for accuracy."""
+    raw = os.getenv("CALIBRATION_POSE_COMPLEXITY", "0").strip()
     try:
-        import cv2
-
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-        k = min(k_clusters, len(pixels))
-        if k < 1:
-            return []
-        _, labels, centres = cv2.kmeans(
-            pixels, k, None, criteria, 5, cv2.KMEANS_PP_CENTERS
+        value = int(raw)
+    except ValueError:
+        return 0
+    return min(2, max(0, value))
+
+
+def _get_pose_solution(mp):
+    pose = getattr(_solutions, "pose", None)
+    if pose is None:
+        pose = mp.solutions.pose.Pose(
+            static_image_mode=True,
+            model_complexity=_pose_model_complexity(),
+            min_detection_confidence=0.5,
         )
-        ranges = []
-        for i in range(k):
-            cluster_pixels = pixels[labels.ravel() == i]
-            if len(cluster_pixels) == 0:
-                continue
-            h_mean, s_mean, v_mean = centres[i]
-            h_std = float(np.std(cluster_pixels[:, 0]))
-            s_std = float(np.std(cluster_pixels[:, 1]))
-            v_std = float(np.std(cluster_pixels[:, 2]))
-            ranges.append({
-                "h_mean": round(float(h_mean), 1),
-                "s_mean": round(float(s_mean), 1),
-                "v_mean": round(float(v_mean), 1),
-                "h_std": round(h_std, 1),
-                "s_std": round(s_std, 1),
-                "v_std": round(v_std, 1),
-                "pixel_count": int(len(cluster_pixels)),
-            })
-        return ranges
+        _solutions.pose = pose
+    return pose
+
+
+def _get_face_mesh_solution(mp):
+    face_mesh = getattr(_solutions, "face_mesh", None)
+    if face_mesh is None:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+        )
+        _solutions.face_mesh = face_mesh
+    return face_mesh
+
+
+def _run_pose(mp, rgb):
+    return _get_pose_solution(mp).process(rgb)
+
+
+def _run_face_mesh(mp, rgb):
+    return _get_face_mesh_solution(mp).process(rgb)
+
+
+def _read_image_dims(image_path: str) -> Optional[tuple[int, int]]:
+    """Return ``(width, height)`` from the image header, or ``None``.
+
+    Pillow (installed with python-pptx) only parses the header here; the
+    pixels are never decoded.
+    """
+    try:
+        from PIL import Image
+        with Image.open(image_path) as img:
+            return img.size
     except Exception:
-        logger.warning("HSV clustering failed", exc_info=True)
-        return []
+        return None
 
 
 def extract_calibration_data(image_path: str | Path) -> Optional[dict]:
@@ -181,135 +288,151 @@ def extract_calibration_data(image_path: str | Path) -> Optional[dict]:
         return None
 
     image_path = str(image_path)
-    frame = cv2.imread(image_path)
+    # Let libjpeg downscale in the DCT domain; only when the half-size copy
+    # falls below the inference size is the image decoded again in full.
+    decode_factor = 2
+    frame = cv2.imread(image_path, cv2.IMREAD_REDUCED_COLOR_2)
+    if frame is None or max(frame.shape[:2]) < _MAX_INFERENCE_DIM:
+        decode_factor = 1
+        frame = cv2.imread(image_path)
     if frame is None:
         logger.warning("Could not read calibration image: %s", image_path)
         return None
 
     h, w = frame.shape[:2]
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    scale = min(1.0, _MAX_INFERENCE_DIM / max(h, w))
+    if scale < 1.0:
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    else:
+        small = frame
+    # Inference runs on the downscaled copy; pixel boxes below still sample
+    # the full-resolution ``frame`` using the original ``h`` / ``w``.
+    # BGR->RGB is a pure channel reorder: a reversed view plus one copy.
+    rgb = np.ascontiguousarray(small[:, :, ::-1])
 
     mp_pose = mp.solutions.pose
-    mp_face_mesh = mp.solutions.face_mesh
 
     result: dict = {}
 
+    # Both models consume the same frame and are independent, so run them
+    # concurrently; TFLite releases the GIL during inference.
+    pose_future = _INFERENCE_POOL.submit(_run_pose, mp, rgb)
+    face_future = _INFERENCE_POOL.submit(_run_face_mesh, mp, rgb)
+    pose_result = pose_future.result()
+    face_result = face_future.result()
+
     # ── Pose: shoulder baselines ──
-    with mp_pose.Pose(
-        static_image_mode=True,
-        model_complexity=1,  # higher accuracy for single image
-        min_detection_confidence=0.5,
-    ) as pose:
-        pose_result = pose.process(rgb)
-        if pose_result.pose_landmarks and pose_result.pose_landmarks.landmark:
-            lm = pose_result.pose_landmarks.landmark
-            ls = lm[mp_pose.PoseLandmark.LEFT_SHOULDER]
-            rs = lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-
-            result["shoulder_baseline_y_left"] = round(ls.y, 4)
-            result["shoulder_baseline_y_right"] = round(rs.y, 4)
-            result["shoulder_baseline_y"] = round((ls.y + rs.y) / 2, 4)
-            result["shoulder_baseline_diff"] = round(abs(ls.y - rs.y), 4)
-
-            # Extract clothing colour near each shoulder (small box below landmark)
-            margin_y = int(h * 0.04)  # ~4% of image height below shoulder
-            half_w = int(w * 0.06)    # ~6% of image width around shoulder
-
-            for side, landmark in [("left", ls), ("right", rs)]:
-                cx = int(landmark.x * w)
-                cy = int(landmark.y * h) + margin_y
-                y1 = max(0, cy)
-                y2 = min(h, cy + margin_y * 2)
-                x1 = max(0, cx - half_w)
-                x2 = min(w, cx + half_w)
-                colours = _extract_region_hsv_ranges(hsv, y1, y2, x1, x2)
-                result[f"clothing_hsv_{side}"] = colours
-        else:
-            logger.info("Calibration: pose not detected — shoulder baselines unavailable")
+    if pose_result.pose_landmarks and pose_result.pose_landmarks.landmark:
+        lm = pose_result.pose_landmarks.landmark
+        ls = lm[mp_pose.PoseLandmark.LEFT_SHOULDER]
+        rs = lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
+
+        result["shoulder_baseline_y_left"] = round(ls.y, 4)
+        result["shoulder_baseline_y_right"] = round(rs.y, 4)
+        result["shoulder_baseline_y"] = round((ls.y + rs.y) / 2, 4)
+        result["shoulder_baseline_diff"] = round(abs(ls.y - rs.y), 4)
+
+        # Extract clothing colour near each shoulder (small box below landmark)
+        margin_y = int(h * 0.04)  # ~4% of image height below shoulder
+        half_w = int(w * 0.06)    # ~6% of image width around shoulder
+
+        for side, landmark in [("left", ls), ("right", rs)]:
+            cx = int(landmark.x * w)
+            cy = int(landmark.y * h) + margin_y
+            y1 = max(0, cy)
+            y2 = min(h, cy + margin_y * 2)
+            x1 = max(0, cx - half_w)
+            x2 = min(w, cx + half_w)
+            if y2 <= y1 or x2 <= x1:
+                result[f"clothing_hsv_{side}"] = []
+                continue
+            # Convert only the sampled box — HSV is never needed elsewhere.
+            hsv_crop = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+            colours = _extract_region_hsv_ranges(
+                hsv_crop, 0, hsv_crop.shape[0], 0, hsv_crop.shape[1]
+            )
+            result[f"clothing_hsv_{side}"] = colours
+    else:
+        logger.info("Calibration: pose not detected — shoulder baselines unavailable")
 
     # ── Face Mesh: iris baseline + head yaw + skin colour ──
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-    ) as face_mesh:
-        face_result = face_mesh.process(rgb)
-        if face_result.multi_face_landmarks and len(face_result.multi_face_landmarks) > 0:
-            fl = face_result.multi_face_landmarks[0].landmark
-
-            # Iris baseline — the TRUE ratio when looking at camera
-            try:
-                r_ratio = _iris_horizontal_ratio(fl[468].x, fl[133].x, fl[33].x)
-                l_ratio = _iris_horizontal_ratio(fl[473].x, fl[362].x, fl[263].x)
-                avg_ratio = (r_ratio + l_ratio) / 2.0
-                result["iris_baseline_ratio"] = round(avg_ratio, 4)
-                result["iris_baseline_left"] = round(l_ratio, 4)
-                result["iris_baseline_right"] = round(r_ratio, 4)
-            except (IndexError, AttributeError):
-                logger.info("Calibration: iris landmarks not available")
-
-            # Head yaw baseline
-            try:
-                yaw = _head_yaw_from_face_landmarks(fl)
-                result["head_yaw_baseline_deg"] = round(yaw, 2)
-            except (IndexError, AttributeError):
-                pass
-
-            # Skin colour from forehead region (between eyebrows and hairline)
-            try:
-                # Forehead approximation: above nose bridge (#6), between temples
-                forehead_y = fl[10].y  # top of forehead landmark
-                nose_bridge_y = fl[6].y
-                mid_y = (forehead_y + nose_bridge_y) / 2.0
-                cx = fl[6].x
-                box_h = int(abs(nose_bridge_y - forehead_y) * h * 0.5)
-                box_w = int(0.08 * w)
-                cy = int(mid_y * h)
-                px = int(cx * w)
-                skin_region = hsv[
-                    max(0, cy - box_h) : min(h, cy + box_h),
-                    max(0, px - box_w) : min(w, px + box_w),
-                ]
-                if skin_region.size > 0:
-                    mean_hsv = np.mean(
-                        skin_region.reshape(-1, 3).astype(np.float32), axis=0
-                    )
-                    result["skin_hsv_mean"] = [round(float(v), 1) for v in mean_hsv]
-            except (IndexError, AttributeError):
-                pass
-            # ── Distance estimation from face width ──
-            try:
-                left_ear = fl[234]   # left side of face
-                right_ear = fl[454]  # right side of face
-                face_width_px = abs(right_ear.x - left_ear.x) * w
-                face_width_ratio = face_width_px / w if w > 0 else 0
-                estimated_dist = _estimate_distance(face_width_ratio)
-
-                result["face_width_ratio"] = round(face_width_ratio, 4)
-                result["estimated_distance_m"] = round(estimated_dist, 2)
-
-                fb = _distance_feedback(estimated_dist)
-                result["distance_ok"] = fb["distance_ok"]
-                result["distance_status"] = fb["distance_status"]
-                result["distance_feedback"] = fb["distance_feedback"]
-
-                logger.info(
-                    "Calibration distance: estimated=%.2f m, face_ratio=%.3f, status=%s",
-                    estimated_dist, face_width_ratio, fb["distance_status"],
-                )
-            except (IndexError, AttributeError):
-                logger.info("Calibration: could not estimate distance")
-        else:
-            logger.info("Calibration: face not detected — iris/yaw baselines unavailable")
+    if face_result.multi_face_landmarks and len(face_result.multi_face_landmarks) > 0:
+        fl = face_result.multi_face_landmarks[0].landmark
+
+        # Iris baseline — the TRUE ratio when looking at camera
+        try:
+            r_ratio = _iris_horizontal_ratio(fl[468].x, fl[133].x, fl[33].x)
+            l_ratio = _iris_horizontal_ratio(fl[473].x, fl[362].x, fl[263].x)
+            avg_ratio = (r_ratio + l_ratio) / 2.0
+            result["iris_baseline_ratio"] = round(avg_ratio, 4)
+            result["iris_baseline_left"] = round(l_ratio, 4)
+            result["iris_baseline_right"] = round(r_ratio, 4)
+        except (IndexError, AttributeError):
+            logger.info("Calibration: iris landmarks not available")
+
+        # Head yaw baseline
+        try:
+            yaw = _head_yaw_from_face_landmarks(fl)
+            result["head_yaw_baseline_deg"] = round(yaw, 2)
+        except (IndexError, AttributeError):
+            pass
+
+        # Skin colour from forehead region (between eyebrows and hairline)
+        try:
+            # Forehead approximation: above nose bridge (#6), between temples
+            forehead_y = fl[10].y  # top of forehead landmark
+            nose_bridge_y = fl[6].y
+            mid_y = (forehead_y + nose_bridge_y) / 2.0
+            cx = fl[6].x
+            box_h = int(abs(nose_bridge_y - forehead_y) * h * 0.5)
+            box_w = int(0.08 * w)
+            cy = int(mid_y * h)
+            px = int(cx * w)
+            skin_bgr = frame[
+                max(0, cy - box_h) : min(h, cy + box_h),
+                max(0, px - box_w) : min(w, px + box_w),
+            ]
+            if skin_bgr.size > 0:
+                # Average in BGR and convert the single mean pixel; close
+                # enough for a presence check and avoids a per-pixel HSV pass.
+                mean_bgr, _ = cv2.meanStdDev(skin_bgr)
+                mean_pixel = np.clip(np.rint(mean_bgr.ravel()), 0, 255).astype(np.uint8)
+                mean_hsv = cv2.cvtColor(mean_pixel.reshape(1, 1, 3), cv2.COLOR_BGR2HSV)
+                result["skin_hsv_mean"] = [round(float(v), 1) for v in mean_hsv.ravel()]
+        except (IndexError, AttributeError):
+            pass
+        # ── Distance estimation from face width ──
+        try:
+            left_ear = fl[234]   # left side of face
+            right_ear = fl[454]  # right side of face
+            face_width_px = abs(right_ear.x - left_ear.x) * w
+            face_width_ratio = face_width_px / w if w > 0 else 0
+            estimated_dist = _estimate_distance(face_width_ratio)
+
+            result["face_width_ratio"] = round(face_width_ratio, 4)
+            result["estimated_distance_m"] = round(estimated_dist, 2)
+
+            fb = _distance_feedback(estimated_dist)
+            result["distance_ok"] = fb["distance_ok"]
+            result["distance_status"] = fb["distance_status"]
+            result["distance_feedback"] = fb["distance_feedback"]
+
+            logger.info(
+                "Calibration distance: estimated=%.2f m, face_ratio=%.3f, status=%s",
+                estimated_dist, face_width_ratio, fb["distance_status"],
+            )
+        except (IndexError, AttributeError):
+            logger.info("Calibration: could not estimate distance")
+    else:
+        logger.info("Calibration: face not detected — iris/yaw baselines unavailable")
 
     if not result:
         logger.warning("Calibration: no features could be extracted from image")
         return None
 
-    result["image_width"] = w
-    result["image_height"] = h
+    # Reduced decodes round odd sizes up, so prefer the header's exact size.
+    dims = _read_image_dims(image_path) if decode_factor > 1 else None
+    result["image_width"], result["image_height"] = dims or (w * decode_factor, h * decode_factor)
     logger.info(
         "Calibration extracted: %s",
         {k: v for k, v in result.items() if not k.startswith("clothing_hsv")},
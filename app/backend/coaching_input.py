@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from functools import cached_property
 from typing import Any, Optional
 
-from pydantic import BaseModel
+import orjson
+from pydantic import BaseModel, TypeAdapter
 
 from .metrics import compute_derived_metrics
 from .storage import JobStore
@@ -15,6 +17,9 @@ class WordTimestamp(BaseModel):
     speaker: Optional[str] = None
 
 
+_WORDS_ADAPTER = TypeAdapter(list[WordTimestamp])
+
+
 class DerivedMetrics(BaseModel):
     duration_seconds: float
     wpm: float
@@ -29,6 +34,16 @@ class DerivedMetrics(BaseModel):
     # Body language metrics (Optional — populated for new jobs with mediapipe)
     body_language: Optional[dict] = None
 
+    # Serialized once per job so prompt builds and repair retries reuse them.
+    # The cache is copied by ``model_copy``, so only update other fields that way.
+    @cached_property
+    def energy_timeline_json(self) -> str:
+        return orjson.dumps(self.energy_timeline or []).decode()
+
+    @cached_property
+    def sentence_pacing_json(self) -> str:
+        return orjson.dumps(self.sentence_pacing or []).decode()
+
 
 class SharedCoachingInput(BaseModel):
     job_id: str
@@ -54,8 +69,24 @@ def _extract_transcript_payload(job) -> tuple[str, list[dict], list[dict]]:
     return full_text, words, segments
 
 
-def load_shared_input(job_store: JobStore, job_id: str) -> SharedCoachingInput:
-    job = job_store.get_job(job_id)
+def _normalize_word(item: dict) -> dict:
+    speaker = item.get("speaker")
+    return {
+        "word": str(item.get("word") or ""),
+        "start": float(item.get("start") or 0.0),
+        "end": float(item.get("end") or 0.0),
+        "speaker": str(speaker) if speaker is not None else None,
+    }
+
+
+def load_shared_input(job_store: JobStore, job_id: str, *, job=None) -> SharedCoachingInput:
+    """Load the coaching input for *job_id*.
+
+    Callers that already fetched the job row can pass it as *job* to skip a
+    second ``get_job`` round trip.
+    """
+    if job is None:
+        job = job_store.get_job(job_id)
     if not job:
         raise RuntimeError(f"Job not found: {job_id}")
 
@@ -86,15 +117,7 @@ def load_shared_input(job_store: JobStore, job_id: str) -> SharedCoachingInput:
     shared_input = SharedCoachingInput(
         job_id=job_id,
         transcript_full_text=transcript_full_text,
-        words=[
-            WordTimestamp(
-                word=str(item.get("word") or ""),
-                start=float(item.get("start") or 0.0),
-                end=float(item.get("end") or 0.0),
-                speaker=(str(item.get("speaker")) if item.get("speaker") is not None else None),
-            )
-            for item in words
-        ],
+        words=_WORDS_ADAPTER.validate_python([_normalize_word(item) for item in words]),
         derived_metrics=DerivedMetrics(**derived_metrics_dict),
         deck_text=deck_text,
     )
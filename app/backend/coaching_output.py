@@ -0,0 +1,84 @@
+"""Helpers shared by the coaching rounds for checking and reusing LLM output."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Callable, Optional
+
+import fastjsonschema
+from json_repair import repair_json
+
+
+logger = logging.getLogger("uvicorn.error")
+
+# Verdicts are matched case-insensitively and may carry stray whitespace.
+VERDICT_SCHEMA = {"type": "string", "pattern": "(?i)^\\s*(strong|mixed|weak)\\s*$"}
+
+
+def validate_sections(payload: Any, validator: Callable[[Any], Any], round_number: int) -> dict:
+    """Run a round's compiled schema over ``payload`` and return it.
+
+    Section criteria are trimmed in place first, so ``"Eye Contact "`` still
+    matches ``"Eye Contact"``.  Schema failures surface as ``RuntimeError``
+    like every other round error.
+    """
+    sections = payload.get("sections") if isinstance(payload, dict) else None
+    if isinstance(sections, list):
+        for section in sections:
+            if isinstance(section, dict) and isinstance(section.get("criterion"), str):
+                section["criterion"] = section["criterion"].strip()
+    try:
+        validator(payload)
+    except fastjsonschema.JsonSchemaException as exc:
+        raise RuntimeError(
+            f"Round {round_number} payload failed schema validation: {exc.message}"
+        ) from exc
+    return payload
+
+
+def looks_like_json_object(raw_content: str) -> bool:
+    """Cheap pre-check so prose-wrapped or truncated output skips a full parse."""
+    text = raw_content.strip()
+    return len(text) >= 2 and text[0] == "{" and text[-1] == "}"
+
+
+def repair_locally(
+    job_id: str,
+    raw_output: str,
+    parse: Callable[[str], dict],
+    round_number: int,
+) -> Optional[dict]:
+    """Fix trivial JSON damage (fences, trailing commas, stray prose) without
+    another LLM call; returns ``None`` when the output is structurally wrong.
+
+    ``parse`` is the round's own parse-and-validate step.
+    """
+    try:
+        parsed = parse(repair_json(raw_output))
+    except Exception as exc:
+        error = str(exc).strip()
+        if len(error) > 200:
+            error = error[:197] + "..."
+        logger.info("job_id=%s round%s_local_repair=miss error=%s", job_id, round_number, error)
+        return None
+    logger.info("job_id=%s round%s_local_repair=hit", job_id, round_number)
+    return parsed
+
+
+def result_key_digest(*static_parts: str) -> "hashlib.blake2b":
+    """Hash the parts of a result key that never change at runtime (version
+    salt, system prompt) once; keys are then derived from copies."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in static_parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest
+
+
+def result_cache_key(static_digest: "hashlib.blake2b", namespace: str, user_prompt: str) -> str:
+    """Key a validated round result by prompt content under ``namespace``."""
+    digest = static_digest.copy()
+    digest.update(user_prompt.encode("utf-8"))
+    digest.update(b"\0")
+    return f"{namespace}:{digest.hexdigest()}"
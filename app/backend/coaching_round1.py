@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
-from typing import Any
+import threading
+from typing import Any, Optional
 
+import fastjsonschema
+import orjson
 from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI
 
 from .coaching_input import SharedCoachingInput, load_shared_input
+from .coaching_output import VERDICT_SCHEMA, validate_sections
+from .llm_client import collect_stream_content
+from .llm_gptsapi import LLM_REQUEST_SLOTS
+from .prompts import compile_template, render_template
 from .prompts.round1 import ROUND_1_VERSION, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from .storage import JobStore
 
@@ -17,11 +23,17 @@ DEFAULT_BASE_URL = "https://api.gptsapi.net/v1"
 DEFAULT_MODEL = "gpt-5.1-chat"
 DEFAULT_TIMEOUT_SECONDS = 120.0
 MAX_ERROR_CHARS = 1200
-EXPECTED_CRITERIA = {
+EXPECTED_CRITERIA = frozenset({
     "Problem Framing",
     "Value Proposition (why it is worth to scale at 10 times)",
     "Differentiation & Defensibility",
-}
+})
+_USER_PROMPT_FORMAT = compile_template(
+    USER_PROMPT_TEMPLATE, "transcript_full_text", "deck_text_or_empty"
+)
+_client: Optional[OpenAI] = None
+_client_key: Optional[tuple[str, str, float]] = None
+_client_lock = threading.Lock()
 
 
 def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
@@ -41,9 +53,17 @@ def _get_api_key() -> str:
 
 
 def _build_client() -> OpenAI:
+    """Return a shared client so its HTTP connection pool (and TLS sessions)
+    is reused across requests; rebuilt only when the settings change."""
+    global _client, _client_key
     base_url = os.getenv("GPTSAPI_BASE_URL", DEFAULT_BASE_URL).strip() or DEFAULT_BASE_URL
     timeout = float(os.getenv("GPTSAPI_TIMEOUT_SECONDS", str(DEFAULT_TIMEOUT_SECONDS)))
-    return OpenAI(base_url=base_url, api_key=_get_api_key(), timeout=timeout)
+    key = (base_url, _get_api_key(), timeout)
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = OpenAI(base_url=base_url, api_key=key[1], timeout=timeout)
+            _client_key = key
+        return _client
 
 
 def _extract_content(value: Any) -> str:
@@ -75,12 +95,10 @@ def _unsupported_temperature(exc: APIStatusError) -> bool:
 
 
 def _build_round1_user_prompt(shared_input: SharedCoachingInput) -> str:
-    return USER_PROMPT_TEMPLATE.replace(
-        "{transcript_full_text}",
-        shared_input.transcript_full_text,
-    ).replace(
-        "{deck_text_or_empty}",
-        shared_input.deck_text or "",
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        transcript_full_text=shared_input.transcript_full_text,
+        deck_text_or_empty=shared_input.deck_text or "",
     )
 
 
@@ -105,21 +123,22 @@ def _request_round1_content(user_prompt: str) -> str:
         {k: v for k, v in base_kwargs.items() if k != "response_format"},
         {k: v for k, v in base_kwargs.items() if k not in {"temperature", "response_format"}},
     ]
-    seen_signatures: set[str] = set()
+    seen_signatures: set[frozenset[str]] = set()
     last_status_error: APIStatusError | None = None
 
     for kwargs in attempts:
-        signature = json.dumps(sorted(kwargs.keys()))
+        signature = frozenset(kwargs)
         if signature in seen_signatures:
             continue
         seen_signatures.add(signature)
 
         try:
-            response = client.chat.completions.create(**kwargs)
-            choice = response.choices[0] if response.choices else None
-            if choice is None:
+            with LLM_REQUEST_SLOTS:
+                stream = client.chat.completions.create(**kwargs, stream=True)
+                streamed = collect_stream_content(stream)
+            if streamed is None:
                 raise RuntimeError("Round 1 response did not contain choices.")
-            content = _extract_content(choice.message.content)
+            content = _extract_content(streamed)
             if not content:
                 raise RuntimeError("Round 1 response content is empty.")
             return content
@@ -157,16 +176,21 @@ def _repair_prompt(invalid_output: str) -> str:
 
 
 def _parse_json_with_repair(raw_content: str) -> dict:
-    try:
-        parsed = json.loads(raw_content)
-    except json.JSONDecodeError:
+    parsed: Any = None
+    if raw_content.lstrip().startswith("{"):
+        try:
+            parsed = orjson.loads(raw_content)
+        except orjson.JSONDecodeError:
+            parsed = None
+
+    if parsed is None:
         start = raw_content.find("{")
         end = raw_content.rfind("}")
         if start == -1 or end <= start:
             raise RuntimeError("Round 1 output is not valid JSON.")
         try:
-            parsed = json.loads(raw_content[start : end + 1])
-        except json.JSONDecodeError as exc:
+            parsed = orjson.loads(raw_content[start : end + 1])
+        except orjson.JSONDecodeError as exc:
             raise RuntimeError("Round 1 output could not be repaired into valid JSON.") from exc
 
     if not isinstance(parsed, dict):
@@ -174,63 +198,53 @@ def _parse_json_with_repair(raw_content: str) -> dict:
     return parsed
 
 
+_SECTION_FIELDS = {
+    "diagnosis": {"type": "string"},
+    "evidence_quotes": {"type": "array"},
+    "what_investors_will_question": {"type": "array"},
+    "missing_information": {"type": "array"},
+    "recommended_rewrites": {"type": "array"},
+}
+ROUND1_SCHEMA = {
+    "type": "object",
+    "required": ["round", "title", "sections", "top_3_actions_for_next_pitch"],
+    "properties": {
+        "round": {"const": 1},
+        "title": {"type": "string", "pattern": "\\S"},
+        "top_3_actions_for_next_pitch": {"type": "array"},
+        "sections": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "required": ["criterion", "verdict", *_SECTION_FIELDS],
+                "properties": {
+                    "criterion": {"enum": sorted(EXPECTED_CRITERIA)},
+                    "verdict": VERDICT_SCHEMA,
+                    **_SECTION_FIELDS,
+                },
+            },
+            # Each criterion exactly once: three items, every criterion present.
+            "allOf": [
+                {"contains": {"properties": {"criterion": {"const": criterion}}}}
+                for criterion in sorted(EXPECTED_CRITERIA)
+            ],
+        },
+    },
+}
+_validate_round1_payload = fastjsonschema.compile(ROUND1_SCHEMA)
+
+
 def _validate_round1_schema(payload: dict) -> dict:
-    if payload.get("round") != 1:
-        raise RuntimeError('Round 1 payload must contain "round": 1.')
-    if not isinstance(payload.get("title"), str) or not str(payload.get("title")).strip():
-        raise RuntimeError('Round 1 payload must contain a non-empty "title" string.')
-
-    sections = payload.get("sections")
-    if not isinstance(sections, list) or len(sections) != 3:
-        raise RuntimeError('Round 1 payload must contain exactly 3 "sections".')
-
-    top_actions = payload.get("top_3_actions_for_next_pitch")
-    if not isinstance(top_actions, list):
-        raise RuntimeError('Round 1 payload must include "top_3_actions_for_next_pitch" as an array.')
-
-    seen_criteria: set[str] = set()
-    for section in sections:
-        if not isinstance(section, dict):
-            raise RuntimeError("Each section must be an object.")
-
-        for key in (
-            "criterion",
-            "verdict",
-            "diagnosis",
-            "evidence_quotes",
-            "what_investors_will_question",
-            "missing_information",
-            "recommended_rewrites",
-        ):
-            if key not in section:
-                raise RuntimeError(f'Round 1 section is missing required key "{key}".')
-
-        criterion = str(section.get("criterion") or "").strip()
-        verdict = str(section.get("verdict") or "").strip().lower()
-        if criterion not in EXPECTED_CRITERIA:
-            raise RuntimeError(f'Unexpected round 1 criterion "{criterion}".')
-        if verdict not in {"strong", "mixed", "weak"}:
-            raise RuntimeError(f'Invalid verdict "{verdict}" in section "{criterion}".')
-        if not isinstance(section.get("diagnosis"), str):
-            raise RuntimeError(f'"diagnosis" must be a string in section "{criterion}".')
-        seen_criteria.add(criterion)
-
-        for list_field in (
-            "evidence_quotes",
-            "what_investors_will_question",
-            "missing_information",
-            "recommended_rewrites",
-        ):
-            if not isinstance(section.get(list_field), list):
-                raise RuntimeError(f'"{list_field}" must be an array in section "{criterion}".')
-
-    if seen_criteria != EXPECTED_CRITERIA:
-        raise RuntimeError("Round 1 sections do not match required criteria.")
-
-    return payload
-
-
-def run_round1(job_store: JobStore, job_id: str) -> dict:
+    return validate_sections(payload, _validate_round1_payload, 1)
+
+
+def run_round1(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> dict:
     job_store.update_job(
         job_id,
         feedback_round_1_status="running",
@@ -239,7 +253,8 @@ def run_round1(job_store: JobStore, job_id: str) -> dict:
     )
 
     try:
-        shared_input = load_shared_input(job_store, job_id)
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id)
         user_prompt = _build_round1_user_prompt(shared_input)
         raw_content = _request_round1_content(user_prompt)
 
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
-import json
 import logging
+from typing import Optional
+
+import fastjsonschema
+import orjson
 
 from .coaching_input import SharedCoachingInput
 from .coaching_input import load_shared_input
+from .coaching_output import VERDICT_SCHEMA, repair_locally, validate_sections
 from .llm_gptsapi import request_chat_completion
+from .prompts import compile_template, render_template
 from .prompts.round2 import ROUND_2_VERSION, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from .storage import JobStore
 
 
 logger = logging.getLogger("uvicorn.error")
 MAX_ERROR_CHARS = 1200
-EXPECTED_CRITERIA = {
+EXPECTED_CRITERIA = frozenset({
     "Clarity & Conviction",
     "Business Model",
     "Market Potential",
-}
+})
+# Everything before the first placeholder is identical across jobs, so it is
+# sent as a cacheable prefix; the repair prompt reuses the cached system prompt.
+_USER_PROMPT_STATIC_PREFIX = USER_PROMPT_TEMPLATE.split("{transcript_full_text}", 1)[0]
+_USER_PROMPT_FORMAT = compile_template(
+    USER_PROMPT_TEMPLATE,
+    "transcript_full_text",
+    "derived_metrics_json",
+    "deck_text_or_empty",
+)
 
 
 def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
@@ -27,73 +41,27 @@ def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
 
 
 def _parse_json(raw_content: str) -> dict:
-    parsed = json.loads(raw_content)
+    parsed = orjson.loads(raw_content)
     if not isinstance(parsed, dict):
         raise RuntimeError("Round 2 JSON root must be an object.")
     return parsed
 
 
-def _validate_round2_schema(payload: dict) -> dict:
-    if payload.get("round") != 2:
-        raise RuntimeError('Round 2 payload must contain "round": 2.')
-    if not isinstance(payload.get("title"), str) or not str(payload.get("title")).strip():
-        raise RuntimeError('Round 2 payload must contain a non-empty "title" string.')
+def _array_fields(*keys: str) -> dict:
+    return {key: {"type": "array"} for key in keys}
 
-    sections = payload.get("sections")
-    if not isinstance(sections, list) or len(sections) != 3:
-        raise RuntimeError('Round 2 payload must contain exactly 3 "sections".')
 
-    top_actions = payload.get("top_3_actions_for_next_pitch")
-    if not isinstance(top_actions, list):
-        raise RuntimeError('Round 2 payload must include "top_3_actions_for_next_pitch" as an array.')
-
-    required_by_criterion = {
-        "Clarity & Conviction": {
+_SECTION_FIELDS_BY_CRITERION = {
+    "Clarity & Conviction": {
+        **_array_fields(
             "diagnosis",
-            "timing_signals_used",
             "what_investors_felt",
             "what_to_fix_next",
             "rewrite_lines_to_increase_conviction",
-        },
-        "Business Model": {
-            "diagnosis",
-            "missing_or_vague",
-            "what_investors_need_to_hear",
-            "recommended_lines",
-        },
-        "Market Potential": {
-            "diagnosis",
-            "missing_or_vague",
-            "credible_market_framing",
-            "recommended_lines",
-        },
-    }
-
-    seen_criteria: set[str] = set()
-    for section in sections:
-        if not isinstance(section, dict):
-            raise RuntimeError("Each round 2 section must be an object.")
-
-        criterion = str(section.get("criterion") or "").strip()
-        verdict = str(section.get("verdict") or "").strip().lower()
-        if criterion not in EXPECTED_CRITERIA:
-            raise RuntimeError(f'Unexpected round 2 criterion "{criterion}".')
-        if verdict not in {"strong", "mixed", "weak"}:
-            raise RuntimeError(f'Invalid verdict "{verdict}" in section "{criterion}".')
-        seen_criteria.add(criterion)
-
-        required_keys = required_by_criterion[criterion]
-        for key in required_keys:
-            if key not in section:
-                raise RuntimeError(f'Round 2 section "{criterion}" is missing key "{key}".')
-            if key != "timing_signals_used" and not isinstance(section.get(key), list):
-                raise RuntimeError(f'Round 2 section "{criterion}" key "{key}" must be an array.')
-
-        if criterion == "Clarity & Conviction":
-            timing = section.get("timing_signals_used")
-            if not isinstance(timing, dict):
-                raise RuntimeError('"timing_signals_used" must be an object for Clarity & Conviction.')
-            for metric_key in (
+        ),
+        "timing_signals_used": {
+            "type": "object",
+            "required": [
                 "duration_seconds",
                 "wpm",
                 "pause_count",
@@ -101,36 +69,77 @@ def _validate_round2_schema(payload: dict) -> dict:
                 "filler_count",
                 "filler_rate_per_min",
                 "top_fillers",
-            ):
-                if metric_key not in timing:
-                    raise RuntimeError(f'"timing_signals_used" missing "{metric_key}".')
-            if not isinstance(timing.get("top_fillers"), list):
-                raise RuntimeError('"timing_signals_used.top_fillers" must be an array.')
+            ],
+            "properties": {"top_fillers": {"type": "array"}},
+        },
+    },
+    "Business Model": _array_fields(
+        "diagnosis",
+        "missing_or_vague",
+        "what_investors_need_to_hear",
+        "recommended_lines",
+    ),
+    "Market Potential": _array_fields(
+        "diagnosis",
+        "missing_or_vague",
+        "credible_market_framing",
+        "recommended_lines",
+    ),
+}
+ROUND2_SCHEMA = {
+    "type": "object",
+    "required": ["round", "title", "sections", "top_3_actions_for_next_pitch"],
+    "properties": {
+        "round": {"const": 2},
+        "title": {"type": "string", "pattern": "\\S"},
+        "top_3_actions_for_next_pitch": {"type": "array"},
+        "sections": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "required": ["criterion", "verdict"],
+                "properties": {
+                    "criterion": {"enum": sorted(EXPECTED_CRITERIA)},
+                    "verdict": VERDICT_SCHEMA,
+                },
+                "allOf": [
+                    {
+                        "if": {"properties": {"criterion": {"const": criterion}}},
+                        "then": {"required": list(fields), "properties": fields},
+                    }
+                    for criterion, fields in _SECTION_FIELDS_BY_CRITERION.items()
+                ],
+            },
+            # Each criterion exactly once: three items, every criterion present.
+            "allOf": [
+                {"contains": {"properties": {"criterion": {"const": criterion}}}}
+                for criterion in sorted(EXPECTED_CRITERIA)
+            ],
+        },
+    },
+}
+_validate_round2_payload = fastjsonschema.compile(ROUND2_SCHEMA)
 
-    if seen_criteria != EXPECTED_CRITERIA:
-        raise RuntimeError("Round 2 sections do not match required criteria.")
 
-    return payload
+def _validate_round2_schema(payload: dict) -> dict:
+    return validate_sections(payload, _validate_round2_payload, 2)
 
 
 def _build_round2_user_prompt(shared_input: SharedCoachingInput) -> str:
-    derived_metrics_dict = shared_input.derived_metrics.model_dump()
-    return (
-        USER_PROMPT_TEMPLATE.replace(
-            "{transcript_full_text}",
-            shared_input.transcript_full_text,
-        )
-        .replace(
-            "{derived_metrics_json}",
-            json.dumps(derived_metrics_dict, ensure_ascii=False),
-        )
-        .replace(
-            "{deck_text_or_empty}",
-            shared_input.deck_text or "",
-        )
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        transcript_full_text=shared_input.transcript_full_text,
+        derived_metrics_json=shared_input.derived_metrics.model_dump_json(),
+        deck_text_or_empty=shared_input.deck_text or "",
     )
 
 
+def _validate_raw_output(raw: str) -> dict:
+    return _validate_round2_schema(_parse_json(raw))
+
+
 def _request_round2_output(user_prompt: str) -> str:
     return request_chat_completion(
         system_prompt=SYSTEM_PROMPT,
@@ -138,6 +147,10 @@ def _request_round2_output(user_prompt: str) -> str:
         temperature=0.3,
         max_tokens=2200,
         response_format={"type": "json_object"},
+        cacheable_user_prefix=_USER_PROMPT_STATIC_PREFIX,
+        # Reuse completions for identical prompts once they pass the schema.
+        cache_sampled=True,
+        cache_validate=_validate_raw_output,
     )
 
 
@@ -149,7 +162,11 @@ def _repair_prompt(invalid_output: str) -> str:
     )
 
 
-def run_round2(job_store: JobStore, job_id: str) -> dict:
+def run_round2(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> dict:
     job_store.update_job(
         job_id,
         feedback_round_2_status="running",
@@ -158,15 +175,18 @@ def run_round2(job_store: JobStore, job_id: str) -> dict:
     )
 
     try:
-        shared_input = load_shared_input(job_store, job_id)
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id)
         user_prompt = _build_round2_user_prompt(shared_input)
         raw_output = _request_round2_output(user_prompt)
 
         try:
             parsed = _validate_round2_schema(_parse_json(raw_output))
         except Exception:
-            repaired_output = _request_round2_output(_repair_prompt(raw_output))
-            parsed = _validate_round2_schema(_parse_json(repaired_output))
+            parsed = repair_locally(job_id, raw_output, _validate_raw_output, 2)
+            if parsed is None:
+                repaired_output = _request_round2_output(_repair_prompt(raw_output))
+                parsed = _validate_round2_schema(_parse_json(repaired_output))
 
         job_store.update_job(
             job_id,
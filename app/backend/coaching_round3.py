@@ -1,22 +1,37 @@
 from __future__ import annotations
 
-import json
 import logging
-import re
+from typing import Optional
+
+import fastjsonschema
+import orjson
 
 from .coaching_input import load_shared_input, SharedCoachingInput, WordTimestamp
+from .coaching_output import VERDICT_SCHEMA, repair_locally, validate_sections
 from .llm_gptsapi import request_chat_completion
+from .prompts import compile_template, render_template
 from .prompts.round3 import ROUND_3_VERSION, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from .storage import JobStore
+from .transcript_alignment import build_word_index, extract_sentence_for_window, parse_time_range
 
 
 logger = logging.getLogger("uvicorn.error")
 MAX_ERROR_CHARS = 1200
-EXPECTED_CRITERIA = {
+EXPECTED_CRITERIA = frozenset({
     "Energy & Presence",
     "Pacing & Emphasis",
     "Tone-Product Alignment",
-}
+})
+# Everything before the first placeholder is identical across jobs, so it is
+# sent as a cacheable prefix; the repair prompt reuses the cached system prompt.
+_USER_PROMPT_STATIC_PREFIX = USER_PROMPT_TEMPLATE.split("{energy_timeline_json}", 1)[0]
+_USER_PROMPT_FORMAT = compile_template(
+    USER_PROMPT_TEMPLATE,
+    "energy_timeline_json",
+    "sentence_pacing_json",
+    "transcript_full_text",
+    "deck_text_or_empty",
+)
 
 
 def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
@@ -27,117 +42,101 @@ def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
 
 
 def _parse_json(raw_content: str) -> dict:
-    parsed = json.loads(raw_content)
+    parsed = orjson.loads(raw_content)
     if not isinstance(parsed, dict):
         raise RuntimeError("Round 3 JSON root must be an object.")
     return parsed
 
 
+# Moment arrays may be empty, but any sentence_text present must be a string or null.
+_MOMENTS_SCHEMA = {
+    "type": "array",
+    "items": {"properties": {"sentence_text": {"type": ["string", "null"]}}},
+}
+_SECTION_FIELDS_BY_CRITERION = {
+    "Energy & Presence": {
+        "required": ["overall_assessment", "well_delivered_moments", "misaligned_moments"],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "well_delivered_moments": _MOMENTS_SCHEMA,
+            "misaligned_moments": _MOMENTS_SCHEMA,
+        },
+    },
+    "Pacing & Emphasis": {
+        "required": ["overall_assessment", "rushed_important_sentences"],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "rushed_important_sentences": _MOMENTS_SCHEMA,
+            "slow_low_priority_sentences": _MOMENTS_SCHEMA,
+            "well_paced_sentences": _MOMENTS_SCHEMA,
+        },
+    },
+    "Tone-Product Alignment": {
+        "required": [
+            "overall_assessment",
+            "inferred_product_type",
+            "why_this_tone",
+            "your_actual_tone",
+            "alignment_assessment",
+            "target_tone_profile",
+            "recommended_adjustments",
+        ],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "inferred_product_type": {"type": "string"},
+            "why_this_tone": {"type": "string"},
+            "your_actual_tone": {"type": "string"},
+            "alignment_assessment": {"type": "array"},
+            "target_tone_profile": {"type": "array"},
+            "recommended_adjustments": {"type": "array"},
+        },
+    },
+}
+ROUND3_SCHEMA = {
+    "type": "object",
+    "required": ["round", "title", "sections", "top_3_vocal_actions"],
+    "properties": {
+        "round": {"const": 3},
+        "title": {"type": "string", "pattern": "\\S"},
+        "top_3_vocal_actions": {"type": "array"},
+        "sections": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "required": ["criterion", "verdict"],
+                "properties": {
+                    "criterion": {"enum": sorted(EXPECTED_CRITERIA)},
+                    "verdict": VERDICT_SCHEMA,
+                },
+                "allOf": [
+                    {
+                        "if": {"properties": {"criterion": {"const": criterion}}},
+                        "then": section_schema,
+                    }
+                    for criterion, section_schema in _SECTION_FIELDS_BY_CRITERION.items()
+                ],
+            },
+            # Each criterion exactly once: three items, every criterion present.
+            "allOf": [
+                {"contains": {"properties": {"criterion": {"const": criterion}}}}
+                for criterion in sorted(EXPECTED_CRITERIA)
+            ],
+        },
+    },
+}
+_validate_round3_payload = fastjsonschema.compile(ROUND3_SCHEMA)
+
+
 def _validate_round3_schema(payload: dict) -> dict:
-    if payload.get("round") != 3:
-        raise RuntimeError('Round 3 payload must contain "round": 3.')
-    if not isinstance(payload.get("title"), str) or not str(payload.get("title")).strip():
-        raise RuntimeError('Round 3 payload must contain a non-empty "title" string.')
-
-    sections = payload.get("sections")
-    if not isinstance(sections, list) or len(sections) != 3:
-        raise RuntimeError('Round 3 payload must contain exactly 3 "sections".')
-
-    vocal_actions = payload.get("top_3_vocal_actions")
-    if not isinstance(vocal_actions, list):
-        raise RuntimeError('Round 3 payload must include "top_3_vocal_actions" as an array.')
-
-    seen_criteria: set[str] = set()
-    for section in sections:
-        if not isinstance(section, dict):
-            raise RuntimeError("Each round 3 section must be an object.")
-
-        criterion = str(section.get("criterion") or "").strip()
-        verdict = str(section.get("verdict") or "").strip().lower()
-        if criterion not in EXPECTED_CRITERIA:
-            raise RuntimeError(f'Unexpected round 3 criterion "{criterion}".')
-        if verdict not in {"strong", "mixed", "weak"}:
-            raise RuntimeError(f'Invalid verdict "{verdict}" in section "{criterion}".')
-        seen_criteria.add(criterion)
-
-        # Section-specific validation
-        if criterion == "Energy & Presence":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string for Energy & Presence.')
-            if not isinstance(section.get("well_delivered_moments"), list):
-                raise RuntimeError('"well_delivered_moments" must be an array.')
-            if not isinstance(section.get("misaligned_moments"), list):
-                raise RuntimeError('"misaligned_moments" must be an array.')
-            # Validate sentence_text in moment arrays (string or null)
-            for arr_key in ("well_delivered_moments", "misaligned_moments"):
-                for m in section.get(arr_key, []):
-                    if isinstance(m, dict) and "sentence_text" in m:
-                        st = m["sentence_text"]
-                        if st is not None and not isinstance(st, str):
-                            raise RuntimeError(f'"sentence_text" in {arr_key} must be a string or null.')
-
-        elif criterion == "Pacing & Emphasis":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string for Pacing & Emphasis.')
-            if not isinstance(section.get("rushed_important_sentences"), list):
-                raise RuntimeError('"rushed_important_sentences" must be an array.')
-            # Validate sentence_text in pacing arrays (string or null)
-            for arr_key in ("rushed_important_sentences", "slow_low_priority_sentences", "well_paced_sentences"):
-                for m in section.get(arr_key, []):
-                    if isinstance(m, dict) and "sentence_text" in m:
-                        st = m["sentence_text"]
-                        if st is not None and not isinstance(st, str):
-                            raise RuntimeError(f'"sentence_text" in {arr_key} must be a string or null.')
-
-        elif criterion == "Tone-Product Alignment":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string for Tone-Product Alignment.')
-            if not isinstance(section.get("inferred_product_type"), str):
-                raise RuntimeError('"inferred_product_type" must be a string.')
-            if not isinstance(section.get("why_this_tone"), str):
-                raise RuntimeError('"why_this_tone" must be a string.')
-            if not isinstance(section.get("your_actual_tone"), str):
-                raise RuntimeError('"your_actual_tone" must be a string.')
-            if not isinstance(section.get("alignment_assessment"), list):
-                raise RuntimeError('"alignment_assessment" must be an array.')
-            if not isinstance(section.get("target_tone_profile"), list):
-                raise RuntimeError('"target_tone_profile" must be an array.')
-            if not isinstance(section.get("recommended_adjustments"), list):
-                raise RuntimeError('"recommended_adjustments" must be an array.')
-
-    if seen_criteria != EXPECTED_CRITERIA:
-        raise RuntimeError("Round 3 sections do not match required criteria.")
-
-    return payload
+    return validate_sections(payload, _validate_round3_payload, 3)
 
 
 # ---------------------------------------------------------------------------
-# Transcript alignment helpers (reused from Round 4 pattern)
+# Transcript alignment (helpers shared with Round 4)
 # ---------------------------------------------------------------------------
 
-def _parse_time_range(time_range: str) -> tuple[float, float] | None:
-    """Parse a time range string like '0:00–0:10' into (start_sec, end_sec)."""
-    tr = time_range.replace("\u2013", "-").replace("\u2014", "-").strip()
-    m = re.match(r"(\d+):(\d{1,2}(?:\.\d+)?)\s*-\s*(\d+):(\d{1,2}(?:\.\d+)?)", tr)
-    if not m:
-        return None
-    start = int(m.group(1)) * 60 + float(m.group(2))
-    end = int(m.group(3)) * 60 + float(m.group(4))
-    return (start, end)
-
-
-def _extract_sentence_for_window(
-    words: list[WordTimestamp], start_sec: float, end_sec: float,
-) -> str | None:
-    if not words:
-        return None
-    overlapping = [w for w in words if w.end > start_sec and w.start < end_sec]
-    if not overlapping:
-        return None
-    text = " ".join(w.word for w in overlapping).strip()
-    return text if text else None
-
-
 def _backfill_round3_sentence_text(parsed: dict, words: list[WordTimestamp]) -> dict:
     """For each moment in Energy & Presence and Pacing & Emphasis, backfill
     sentence_text from the actual transcript word timestamps."""
@@ -146,36 +145,37 @@ def _backfill_round3_sentence_text(parsed: dict, words: list[WordTimestamp]) ->
         "Pacing & Emphasis": ["rushed_important_sentences", "slow_low_priority_sentences", "well_paced_sentences"],
     }
 
+    word_index = build_word_index(words)
     for section in parsed.get("sections", []):
         criterion = section.get("criterion", "")
         moment_keys = _MOMENT_KEYS_BY_CRITERION.get(criterion, [])
         for key in moment_keys:
             for moment in section.get(key, []):
                 tr = moment.get("time_range", "")
-                parsed_range = _parse_time_range(tr)
+                parsed_range = parse_time_range(tr)
                 if parsed_range is None:
                     if "sentence_text" not in moment:
                         moment["sentence_text"] = None
                     continue
                 start, end = parsed_range
-                extracted = _extract_sentence_for_window(words, start, end)
+                extracted = extract_sentence_for_window(word_index, start, end)
                 moment["sentence_text"] = extracted
     return parsed
 
 
 def _build_round3_user_prompt(shared_input: SharedCoachingInput) -> str:
-    derived = shared_input.derived_metrics.model_dump()
+    derived = shared_input.derived_metrics
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        energy_timeline_json=derived.energy_timeline_json,
+        sentence_pacing_json=derived.sentence_pacing_json,
+        transcript_full_text=shared_input.transcript_full_text,
+        deck_text_or_empty=shared_input.deck_text or "",
+    )
 
-    energy_timeline = derived.get("energy_timeline") or []
-    sentence_pacing = derived.get("sentence_pacing") or []
 
-    return (
-        USER_PROMPT_TEMPLATE
-        .replace("{energy_timeline_json}", json.dumps(energy_timeline, ensure_ascii=False))
-        .replace("{sentence_pacing_json}", json.dumps(sentence_pacing, ensure_ascii=False))
-        .replace("{transcript_full_text}", shared_input.transcript_full_text)
-        .replace("{deck_text_or_empty}", shared_input.deck_text or "")
-    )
+def _validate_raw_output(raw: str) -> dict:
+    return _validate_round3_schema(_parse_json(raw))
 
 
 def _request_round3_output(user_prompt: str) -> str:
@@ -185,6 +185,10 @@ def _request_round3_output(user_prompt: str) -> str:
         temperature=0.3,
         max_tokens=2500,
         response_format={"type": "json_object"},
+        cacheable_user_prefix=_USER_PROMPT_STATIC_PREFIX,
+        # Reuse completions for identical prompts once they pass the schema.
+        cache_sampled=True,
+        cache_validate=_validate_raw_output,
     )
 
 
@@ -196,7 +200,11 @@ def _repair_prompt(invalid_output: str) -> str:
     )
 
 
-def run_round3(job_store: JobStore, job_id: str) -> dict:
+def run_round3(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> dict:
     job_store.update_job(
         job_id,
         feedback_round_3_status="running",
@@ -205,11 +213,12 @@ def run_round3(job_store: JobStore, job_id: str) -> dict:
     )
 
     try:
-        shared_input = load_shared_input(job_store, job_id)
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id)
 
         # Check that tone data is available
-        derived = shared_input.derived_metrics.model_dump()
-        if not derived.get("energy_timeline") and not derived.get("sentence_pacing"):
+        derived = shared_input.derived_metrics
+        if not derived.energy_timeline and not derived.sentence_pacing:
             raise RuntimeError(
                 "Tone metrics (energy_timeline / sentence_pacing) are not available for this job. "
                 "The audio may have been too short or processing failed."
@@ -221,8 +230,10 @@ def run_round3(job_store: JobStore, job_id: str) -> dict:
         try:
             parsed = _validate_round3_schema(_parse_json(raw_output))
         except Exception:
-            repaired_output = _request_round3_output(_repair_prompt(raw_output))
-            parsed = _validate_round3_schema(_parse_json(repaired_output))
+            parsed = repair_locally(job_id, raw_output, _validate_raw_output, 3)
+            if parsed is None:
+                repaired_output = _request_round3_output(_repair_prompt(raw_output))
+                parsed = _validate_round3_schema(_parse_json(repaired_output))
 
         # Backfill sentence_text from actual transcript word timestamps
         parsed = _backfill_round3_sentence_text(parsed, shared_input.words)
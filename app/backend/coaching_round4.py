@@ -1,27 +1,67 @@
 from __future__ import annotations
 
-import json
 import logging
-import re
 import shutil
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+import fastjsonschema
+import orjson
+
 from .coaching_input import load_shared_input, SharedCoachingInput, WordTimestamp
-from .gcs_utils import download_blob_to_file
+from .coaching_output import (
+    VERDICT_SCHEMA,
+    looks_like_json_object,
+    repair_locally,
+    result_cache_key,
+    result_key_digest,
+    validate_sections,
+)
+from .gcs_utils import download_blob_to_file, parse_gcs_uri
+from .llm_cache import get_llm_cache
 from .llm_gptsapi import request_chat_completion
+from .prompts import compile_template, render_template
 from .prompts.round4 import ROUND_4_VERSION, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from .storage import JobStore
+from .transcript_alignment import build_word_index, extract_sentence_for_window, parse_time_range
 
 
 logger = logging.getLogger("uvicorn.error")
 MAX_ERROR_CHARS = 1200
-EXPECTED_CRITERIA = {
+EXPECTED_CRITERIA = frozenset({
     "Posture & Stillness",
     "Eye Contact",
     "Calm Confidence",
-}
+})
+# Everything before the first placeholder is identical across jobs, so it is
+# sent as a cacheable prefix; the repair prompt reuses the cached system prompt.
+_USER_PROMPT_STATIC_PREFIX = USER_PROMPT_TEMPLATE.split("{body_language_summary_json}", 1)[0]
+_USER_PROMPT_FORMAT = compile_template(
+    USER_PROMPT_TEMPLATE,
+    "body_language_summary_json",
+    "posture_timeline_json",
+    "unstable_events_json",
+    "eye_contact_timeline_json",
+    "look_away_events_json",
+    "facing_timeline_json",
+    "turned_away_events_json",
+    "transcript_full_text",
+    "deck_text_or_empty",
+)
+
+
+# Recomputation downloads the video and runs MediaPipe over every frame, so
+# concurrent jobs share a small pool instead of each oversubscribing the CPU,
+# and a job that is already being recomputed joins the in-flight future.
+_RECOMPUTE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="round4_recompute")
+_recompute_inflight: dict[str, Future] = {}
+_recompute_lock = threading.Lock()
+# Scratch videos are deleted off the request path, but never behind queued
+# recomputes: a video on a RAM-backed scratch dir must be freed promptly.
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="round4_cleanup")
 
 
 def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
@@ -35,7 +75,7 @@ def _recompute_body_language(job_store: JobStore, job_id: str) -> Optional[dict]
     """Try to recompute body-language metrics by downloading the video from
     GCS and running MediaPipe analysis.  Returns the metrics dict on success
     or ``None`` on any failure."""
-    from .video_metrics import BODY_LANGUAGE_AVAILABLE
+    from .video_metrics import BODY_LANGUAGE_AVAILABLE, video_scratch_dir
     if not BODY_LANGUAGE_AVAILABLE:
         logger.error("job_id=%s cannot compute body language: mediapipe/opencv not installed", job_id)
         return None
@@ -45,7 +85,7 @@ def _recompute_body_language(job_store: JobStore, job_id: str) -> Optional[dict]
         logger.warning("job_id=%s job not found for body language recomputation", job_id)
         return None
 
-    video_gcs_uri = getattr(job, "video_gcs_uri", None) or ""
+    video_gcs_uri = job.video_gcs_uri or ""
     if not video_gcs_uri:
         logger.error(
             "job_id=%s no video_gcs_uri stored — the video was never uploaded to GCS. "
@@ -55,19 +95,13 @@ def _recompute_body_language(job_store: JobStore, job_id: str) -> Optional[dict]
         )
         return None
 
-    # Parse gs://bucket/blob from the URI
-    if not video_gcs_uri.startswith("gs://"):
+    try:
+        bucket, blob_path = parse_gcs_uri(video_gcs_uri)
+    except ValueError:
         logger.warning("job_id=%s invalid video_gcs_uri=%s", job_id, video_gcs_uri)
         return None
 
-    stripped = video_gcs_uri[len("gs://"):]
-    slash_idx = stripped.find("/")
-    if slash_idx <= 0:
-        return None
-    bucket = stripped[:slash_idx]
-    blob_path = stripped[slash_idx + 1:]
-
-    tmp_dir = Path(tempfile.mkdtemp(prefix=f"r4_bl_{job_id}_"))
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f"r4_bl_{job_id}_", dir=video_scratch_dir()))
     suffix = Path(blob_path).suffix or ".webm"
     local_video = tmp_dir / f"video{suffix}"
     try:
@@ -82,7 +116,7 @@ def _recompute_body_language(job_store: JobStore, job_id: str) -> Optional[dict]
         from .video_metrics import compute_body_language_metrics
 
         # Load calibration data if available
-        cal_data = getattr(job, "calibration_data", None)
+        cal_data = job.calibration_data
         result = compute_body_language_metrics(local_video, calibration=cal_data)
         if result is None:
             logger.warning(
@@ -102,166 +136,177 @@ def _recompute_body_language(job_store: JobStore, job_id: str) -> Optional[dict]
         logger.error("job_id=%s body_language recomputation failed", job_id, exc_info=True)
         return None
     finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
-
-
-def _parse_json(raw_content: str) -> dict:
-    parsed = json.loads(raw_content)
-    if not isinstance(parsed, dict):
-        raise RuntimeError("Round 4 JSON root must be an object.")
-    return parsed
+        # Deleting a large video can take a while on slow disks; hand it to
+        # the cleanup worker so the result returns straight to Round 4.
+        _CLEANUP_POOL.submit(shutil.rmtree, tmp_dir, ignore_errors=True)
+
+
+def _recompute_body_language_shared(job_store: JobStore, job_id: str) -> Optional[dict]:
+    submitted = False
+    with _recompute_lock:
+        future = _recompute_inflight.get(job_id)
+        if future is None:
+            future = _RECOMPUTE_POOL.submit(_recompute_body_language, job_store, job_id)
+            _recompute_inflight[job_id] = future
+            submitted = True
+    if submitted:
+        # Registered outside the lock: an already-finished future runs the
+        # callback inline, and it takes the lock itself.
+        future.add_done_callback(lambda done: _forget_recompute(job_id, done))
+    return future.result()
+
+
+def _forget_recompute(job_id: str, future: Future) -> None:
+    with _recompute_lock:
+        if _recompute_inflight.get(job_id) is future:
+            del _recompute_inflight[job_id]
+
+
+_MOMENTS_SCHEMA = {"type": "array"}
+# Moments whose sentence_text is echoed back must carry a string or null.
+_SENTENCE_MOMENTS_SCHEMA = {
+    "type": "array",
+    "items": {"properties": {"sentence_text": {"type": ["string", "null"]}}},
+}
+_SECTION_FIELDS_BY_CRITERION = {
+    "Posture & Stillness": {
+        "required": ["overall_assessment", "stable_moments", "unstable_moments"],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "stable_moments": _SENTENCE_MOMENTS_SCHEMA,
+            "unstable_moments": _MOMENTS_SCHEMA,
+        },
+    },
+    "Eye Contact": {
+        "required": ["overall_assessment", "strong_eye_contact_moments", "look_away_moments"],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "strong_eye_contact_moments": _MOMENTS_SCHEMA,
+            "look_away_moments": _MOMENTS_SCHEMA,
+        },
+    },
+    "Calm Confidence": {
+        "required": [
+            "overall_assessment",
+            "confident_moments",
+            "turned_away_events",
+            "why_facing_matters",
+            "recommended_stance_adjustments",
+        ],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "confident_moments": _SENTENCE_MOMENTS_SCHEMA,
+            "turned_away_events": _SENTENCE_MOMENTS_SCHEMA,
+            "why_facing_matters": {"type": "string"},
+            "recommended_stance_adjustments": {"type": "array"},
+        },
+    },
+}
+ROUND4_SCHEMA = {
+    "type": "object",
+    "required": ["round", "title", "sections", "top_3_body_language_actions"],
+    "properties": {
+        "round": {"const": 4},
+        "title": {"type": "string", "pattern": "\\S"},
+        "top_3_body_language_actions": {"type": "array"},
+        "sections": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "required": ["criterion", "verdict"],
+                "properties": {
+                    "criterion": {"enum": sorted(EXPECTED_CRITERIA)},
+                    "verdict": VERDICT_SCHEMA,
+                },
+                "allOf": [
+                    {
+                        "if": {"properties": {"criterion": {"const": criterion}}},
+                        "then": section_schema,
+                    }
+                    for criterion, section_schema in _SECTION_FIELDS_BY_CRITERION.items()
+                ],
+            },
+            # Each criterion exactly once: three items, every criterion present.
+            "allOf": [
+                {"contains": {"properties": {"criterion": {"const": criterion}}}}
+                for criterion in sorted(EXPECTED_CRITERIA)
+            ],
+        },
+    },
+}
+_validate_round4_payload = fastjsonschema.compile(ROUND4_SCHEMA)
 
 
 def _validate_round4_schema(payload: dict) -> dict:
-    if payload.get("round") != 4:
-        raise RuntimeError('Round 4 payload must contain "round": 4.')
-    if not isinstance(payload.get("title"), str) or not str(payload.get("title")).strip():
-        raise RuntimeError('Round 4 payload must contain a non-empty "title" string.')
+    return validate_sections(payload, _validate_round4_payload, 4)
 
-    sections = payload.get("sections")
-    if not isinstance(sections, list) or len(sections) != 3:
-        raise RuntimeError('Round 4 payload must contain exactly 3 "sections".')
 
-    body_actions = payload.get("top_3_body_language_actions")
-    if not isinstance(body_actions, list):
-        raise RuntimeError('Round 4 payload must include "top_3_body_language_actions" as an array.')
-
-    seen_criteria: set[str] = set()
-    for section in sections:
-        if not isinstance(section, dict):
-            raise RuntimeError("Each round 4 section must be an object.")
-
-        criterion = str(section.get("criterion") or "").strip()
-        verdict = str(section.get("verdict") or "").strip().lower()
-        if criterion not in EXPECTED_CRITERIA:
-            raise RuntimeError(f'Unexpected round 4 criterion "{criterion}".')
-        if verdict not in {"strong", "mixed", "weak"}:
-            raise RuntimeError(f'Invalid verdict "{verdict}" in section "{criterion}".')
-        seen_criteria.add(criterion)
-
-        # Section-specific validation
-        if criterion == "Posture & Stillness":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string in Posture & Stillness.')
-            if not isinstance(section.get("stable_moments"), list):
-                raise RuntimeError('"stable_moments" must be an array.')
-            # Validate sentence_text in each stable moment (string or null)
-            for sm in section.get("stable_moments", []):
-                if isinstance(sm, dict) and "sentence_text" in sm:
-                    st = sm["sentence_text"]
-                    if st is not None and not isinstance(st, str):
-                        raise RuntimeError('"sentence_text" in stable_moments must be a string or null.')
-            if not isinstance(section.get("unstable_moments"), list):
-                raise RuntimeError('"unstable_moments" must be an array.')
-
-        elif criterion == "Eye Contact":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string in Eye Contact.')
-            if not isinstance(section.get("strong_eye_contact_moments"), list):
-                raise RuntimeError('"strong_eye_contact_moments" must be an array.')
-            if not isinstance(section.get("look_away_moments"), list):
-                raise RuntimeError('"look_away_moments" must be an array.')
-
-        elif criterion == "Calm Confidence":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string in Calm Confidence.')
-            if not isinstance(section.get("confident_moments"), list):
-                raise RuntimeError('"confident_moments" must be an array.')
-            # Validate sentence_text in confident moments (string or null)
-            for cm in section.get("confident_moments", []):
-                if isinstance(cm, dict) and "sentence_text" in cm:
-                    st = cm["sentence_text"]
-                    if st is not None and not isinstance(st, str):
-                        raise RuntimeError('"sentence_text" in confident_moments must be a string or null.')
-            if not isinstance(section.get("turned_away_events"), list):
-                raise RuntimeError('"turned_away_events" must be an array.')
-            # Validate sentence_text in turned away events (string or null)
-            for ta in section.get("turned_away_events", []):
-                if isinstance(ta, dict) and "sentence_text" in ta:
-                    st = ta["sentence_text"]
-                    if st is not None and not isinstance(st, str):
-                        raise RuntimeError('"sentence_text" in turned_away_events must be a string or null.')
-            if not isinstance(section.get("why_facing_matters"), str):
-                raise RuntimeError('"why_facing_matters" must be a string.')
-            if not isinstance(section.get("recommended_stance_adjustments"), list):
-                raise RuntimeError('"recommended_stance_adjustments" must be an array.')
-
-    if seen_criteria != EXPECTED_CRITERIA:
-        raise RuntimeError("Round 4 sections do not match required criteria.")
-
-    return payload
+def _parse_round4_payload(raw_content: str) -> dict:
+    # Prose-wrapped or truncated output goes straight to repair without a
+    # full parse; the schema's root "type": "object" covers the rest.
+    if not looks_like_json_object(raw_content):
+        raise RuntimeError("Round 4 output is not a complete JSON object.")
+    return _validate_round4_schema(orjson.loads(raw_content))
 
 
 # ---------------------------------------------------------------------------
 # Transcript alignment helpers
 # ---------------------------------------------------------------------------
 
-def _parse_time_range(time_range: str) -> tuple[float, float] | None:
-    """Parse a time range string like '0:00–0:10' or '1:30–2:00' into
-    (start_sec, end_sec).  Returns None if parsing fails."""
-    # Normalise various dash characters
-    tr = time_range.replace("\u2013", "-").replace("\u2014", "-").strip()
-    m = re.match(r"(\d+):(\d{1,2}(?:\.\d+)?)\s*-\s*(\d+):(\d{1,2}(?:\.\d+)?)", tr)
-    if not m:
-        return None
-    start = int(m.group(1)) * 60 + float(m.group(2))
-    end = int(m.group(3)) * 60 + float(m.group(4))
-    return (start, end)
-
-
-def _extract_sentence_for_window(
-    words: list[WordTimestamp],
-    start_sec: float,
-    end_sec: float,
-) -> str | None:
-    """Return the transcript text spoken during [start_sec, end_sec].
-
-    Selects all words whose time ranges overlap the window and joins them.
-    If no words overlap, returns None.
-    """
-    if not words:
-        return None
-    overlapping = [
-        w for w in words
-        if w.end > start_sec and w.start < end_sec
-    ]
-    if not overlapping:
-        return None
-    text = " ".join(w.word for w in overlapping).strip()
-    return text if text else None
+# Map: criterion -> moment-array keys to backfill
+_MOMENT_KEYS_BY_CRITERION: dict[str, tuple[str, ...]] = {
+    "Posture & Stillness": ("stable_moments", "unstable_moments"),
+    "Eye Contact": ("strong_eye_contact_moments", "look_away_moments"),
+    "Calm Confidence": ("confident_moments", "turned_away_events"),
+}
 
 
 def _backfill_sentence_text(parsed: dict, words: list[WordTimestamp]) -> dict:
     """For each moment card across all Round 4 sections, populate
     sentence_text from the actual transcript word timestamps.  This ensures
     accuracy even if the LLM hallucinated or omitted the text."""
-    # Map: criterion -> list of moment-array keys to backfill
-    _MOMENT_KEYS_BY_CRITERION: dict[str, list[str]] = {
-        "Posture & Stillness": ["stable_moments", "unstable_moments"],
-        "Eye Contact": ["strong_eye_contact_moments", "look_away_moments"],
-        "Calm Confidence": ["confident_moments", "turned_away_events"],
-    }
-
-    for section in parsed.get("sections", []):
+    sections = parsed.get("sections")
+    if not sections:
+        return parsed
+
+    # Without words every parseable window comes back empty, so skip
+    # building the index and clear those moments directly.
+    word_index = build_word_index(words) if words else None
+    parse_range = parse_time_range
+    extract_sentence = extract_sentence_for_window
+    for section in sections:
         criterion = section.get("criterion", "")
-        moment_keys = _MOMENT_KEYS_BY_CRITERION.get(criterion, [])
-        for key in moment_keys:
-            for moment in section.get(key, []):
-                tr = moment.get("time_range", "")
-                parsed_range = _parse_time_range(tr)
+        for key in _MOMENT_KEYS_BY_CRITERION.get(criterion, ()):
+            for moment in section.get(key) or ():
+                tr = moment.get("time_range")
+                parsed_range = parse_range(tr) if tr else None
                 if parsed_range is None:
-                    if "sentence_text" not in moment:
-                        moment["sentence_text"] = None
+                    moment.setdefault("sentence_text", None)
                     continue
-                start, end = parsed_range
-                extracted = _extract_sentence_for_window(words, start, end)
-                moment["sentence_text"] = extracted  # override with ground truth
+                # override with ground truth
+                moment["sentence_text"] = (
+                    extract_sentence(word_index, *parsed_range) if word_index else None
+                )
     return parsed
 
 
+def _dumps(value) -> str:
+    # Event lists are usually empty for short pitches.
+    if type(value) is list and not value:
+        return "[]"
+    if type(value) is dict and not value:
+        return "{}"
+    # Freshly recomputed metrics have not been through a JSON round trip, so
+    # keep json.dumps' tolerance for non-string dict keys.
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def _build_round4_user_prompt(shared_input: SharedCoachingInput) -> str:
-    derived = shared_input.derived_metrics.model_dump()
-    body_language = derived.get("body_language") or {}
+    # body_language is a plain dict field, so read it directly rather than
+    # dumping the whole metrics model (timelines included) to reach it.
+    body_language = shared_input.derived_metrics.body_language or {}
 
     posture_timeline = body_language.get("posture_timeline") or []
     eye_contact_timeline = body_language.get("eye_contact_timeline") or []
@@ -271,17 +316,17 @@ def _build_round4_user_prompt(shared_input: SharedCoachingInput) -> str:
     turned_away_events = body_language.get("turned_away_events") or []
     summary = body_language.get("summary") or {}
 
-    return (
-        USER_PROMPT_TEMPLATE
-        .replace("{body_language_summary_json}", json.dumps(summary, ensure_ascii=False))
-        .replace("{posture_timeline_json}", json.dumps(posture_timeline, ensure_ascii=False))
-        .replace("{unstable_events_json}", json.dumps(unstable_events, ensure_ascii=False))
-        .replace("{eye_contact_timeline_json}", json.dumps(eye_contact_timeline, ensure_ascii=False))
-        .replace("{look_away_events_json}", json.dumps(look_away_events, ensure_ascii=False))
-        .replace("{facing_timeline_json}", json.dumps(facing_timeline, ensure_ascii=False))
-        .replace("{turned_away_events_json}", json.dumps(turned_away_events, ensure_ascii=False))
-        .replace("{transcript_full_text}", shared_input.transcript_full_text)
-        .replace("{deck_text_or_empty}", shared_input.deck_text or "")
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        body_language_summary_json=_dumps(summary),
+        posture_timeline_json=_dumps(posture_timeline),
+        unstable_events_json=_dumps(unstable_events),
+        eye_contact_timeline_json=_dumps(eye_contact_timeline),
+        look_away_events_json=_dumps(look_away_events),
+        facing_timeline_json=_dumps(facing_timeline),
+        turned_away_events_json=_dumps(turned_away_events),
+        transcript_full_text=shared_input.transcript_full_text,
+        deck_text_or_empty=shared_input.deck_text or "",
     )
 
 
@@ -292,9 +337,15 @@ def _request_round4_output(user_prompt: str) -> str:
         temperature=0.3,
         max_tokens=2500,
         response_format={"type": "json_object"},
+        cacheable_user_prefix=_USER_PROMPT_STATIC_PREFIX,
     )
 
 
+# The version salt and system prompt never change at runtime, so they are
+# hashed once and each key only feeds the user prompt into a copy.
+_RESULT_KEY_DIGEST = result_key_digest(ROUND_4_VERSION, SYSTEM_PROMPT)
+
+
 def _repair_prompt(invalid_output: str) -> str:
     return (
         "Your previous output was invalid JSON. Return ONLY corrected valid JSON matching "
@@ -303,7 +354,11 @@ def _repair_prompt(invalid_output: str) -> str:
     )
 
 
-def run_round4(job_store: JobStore, job_id: str) -> dict:
+def run_round4(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> dict:
     job_store.update_job(
         job_id,
         feedback_round_4_status="running",
@@ -312,22 +367,27 @@ def run_round4(job_store: JobStore, job_id: str) -> dict:
     )
 
     try:
-        shared_input = load_shared_input(job_store, job_id)
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id)
 
         # Check that body language data is available; recompute on demand
         # from the GCS-stored video if missing.
-        derived = shared_input.derived_metrics.model_dump()
-        body_language = derived.get("body_language")
+        body_language = shared_input.derived_metrics.body_language
         if not body_language:
             logger.info("job_id=%s round4 body_language missing, attempting recomputation", job_id)
-            body_language = _recompute_body_language(job_store, job_id)
+            body_language = _recompute_body_language_shared(job_store, job_id)
             if body_language:
-                # Persist so future rounds don't need to recompute
-                derived["body_language"] = body_language
-                job_store.update_job(job_id, derived_metrics=derived)
+                # The metrics model is shared with rounds running alongside
+                # this one, so swap in a shallow copy rather than mutating it.
+                # The copy carries the recomputed dict by reference.
                 shared_input.derived_metrics = shared_input.derived_metrics.model_copy(
                     update={"body_language": body_language}
                 )
+                # Persist so future rounds don't need to recompute
+                job_store.update_job(
+                    job_id,
+                    derived_metrics=shared_input.derived_metrics.model_dump(),
+                )
                 logger.info("job_id=%s round4 body_language recomputed successfully", job_id)
             else:
                 raise RuntimeError(
@@ -337,13 +397,27 @@ def run_round4(job_store: JobStore, job_id: str) -> dict:
                 )
 
         user_prompt = _build_round4_user_prompt(shared_input)
-        raw_output = _request_round4_output(user_prompt)
-
-        try:
-            parsed = _validate_round4_schema(_parse_json(raw_output))
-        except Exception:
-            repaired_output = _request_round4_output(_repair_prompt(raw_output))
-            parsed = _validate_round4_schema(_parse_json(repaired_output))
+        # Re-triggered jobs with unchanged inputs reuse the validated result
+        # instead of sampling a new completion.
+        cache = get_llm_cache()
+        cache_key = result_cache_key(_RESULT_KEY_DIGEST, "round4_result", user_prompt)
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            parsed = orjson.loads(cached)
+            logger.info("job_id=%s round4_result_cache=hit", job_id)
+        else:
+            raw_output = _request_round4_output(user_prompt)
+
+            try:
+                parsed = _parse_round4_payload(raw_output)
+            except Exception:
+                parsed = repair_locally(job_id, raw_output, _parse_round4_payload, 4)
+                if parsed is None:
+                    repaired_output = _request_round4_output(_repair_prompt(raw_output))
+                    parsed = _parse_round4_payload(repaired_output)
+
+            if cache is not None:
+                cache.set(cache_key, _dumps(parsed))
 
         # Backfill sentence_text from actual transcript word timestamps
         # (overrides any LLM-generated text with ground truth)
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
-import json
 import logging
+from typing import Optional
+
+import fastjsonschema
+import orjson
 
 from .coaching_input import SharedCoachingInput, load_shared_input
+from .coaching_output import (
+    VERDICT_SCHEMA,
+    looks_like_json_object,
+    result_cache_key,
+    result_key_digest,
+    validate_sections,
+)
+from .llm_cache import get_llm_cache
 from .llm_gptsapi import request_chat_completion
+from .prompts import compile_template, render_template
 from .prompts.round5 import ROUND_5_VERSION, SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 from .storage import JobStore
 
 
 logger = logging.getLogger("uvicorn.error")
 MAX_ERROR_CHARS = 1200
-EXPECTED_CRITERIA = {"Overview", "Pitch Deck Evaluation"}
+EXPECTED_CRITERIA = frozenset({"Overview", "Pitch Deck Evaluation"})
 NO_DECK_OVERALL_ASSESSMENT = "There is no slide uploaded"
+_USER_PROMPT_FORMAT = compile_template(
+    USER_PROMPT_TEMPLATE,
+    "round1_feedback_json",
+    "round2_feedback_json",
+    "round3_feedback_json",
+    "round4_feedback_json",
+    "transcript_full_text",
+    "deck_text_or_empty",
+)
 
 
 def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
@@ -22,72 +43,90 @@ def _truncate(text: str, max_chars: int = MAX_ERROR_CHARS) -> str:
     return value[: max_chars - 3] + "..."
 
 
-def _parse_json(raw_content: str) -> dict:
-    parsed = json.loads(raw_content)
-    if not isinstance(parsed, dict):
-        raise RuntimeError("Round 5 JSON root must be an object.")
-    return parsed
+_SECTION_FIELDS_BY_CRITERION = {
+    "Overview": {
+        "required": ["overall_evaluation", "key_strengths", "areas_of_improvement"],
+        "properties": {
+            "overall_evaluation": {"type": "string"},
+            "key_strengths": {"type": "array"},
+            "areas_of_improvement": {"type": "array"},
+        },
+    },
+    "Pitch Deck Evaluation": {
+        "required": [
+            "overall_assessment",
+            "lacking_content",
+            "structural_flow_issues",
+            "recommended_refinements",
+        ],
+        "properties": {
+            "overall_assessment": {"type": "string"},
+            "lacking_content": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["what", "why"],
+                    "properties": {"what": {"type": "string"}, "why": {"type": "string"}},
+                },
+            },
+            "structural_flow_issues": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["issue", "impact"],
+                    "properties": {"issue": {"type": "string"}, "impact": {"type": "string"}},
+                },
+            },
+            "recommended_refinements": {"type": "array"},
+        },
+    },
+}
+ROUND5_SCHEMA = {
+    "type": "object",
+    "required": ["round", "title", "sections"],
+    "properties": {
+        "round": {"const": 5},
+        "title": {"type": "string", "pattern": "\\S"},
+        "sections": {
+            "type": "array",
+            "minItems": 2,
+            "maxItems": 2,
+            "items": {
+                "type": "object",
+                "required": ["criterion", "verdict"],
+                "properties": {
+                    "criterion": {"enum": sorted(EXPECTED_CRITERIA)},
+                    "verdict": VERDICT_SCHEMA,
+                },
+                "allOf": [
+                    {
+                        "if": {"properties": {"criterion": {"const": criterion}}},
+                        "then": section_schema,
+                    }
+                    for criterion, section_schema in _SECTION_FIELDS_BY_CRITERION.items()
+                ],
+            },
+            # Each criterion exactly once: two items, every criterion present.
+            "allOf": [
+                {"contains": {"properties": {"criterion": {"const": criterion}}}}
+                for criterion in sorted(EXPECTED_CRITERIA)
+            ],
+        },
+    },
+}
+_validate_round5_payload = fastjsonschema.compile(ROUND5_SCHEMA)
 
 
 def _validate_round5_schema(payload: dict) -> dict:
-    if payload.get("round") != 5:
-        raise RuntimeError('Round 5 payload must contain "round": 5.')
-    if not isinstance(payload.get("title"), str) or not str(payload.get("title")).strip():
-        raise RuntimeError('Round 5 payload must contain a non-empty "title" string.')
+    return validate_sections(payload, _validate_round5_payload, 5)
 
-    sections = payload.get("sections")
-    if not isinstance(sections, list) or len(sections) != 2:
-        raise RuntimeError('Round 5 payload must contain exactly 2 "sections".')
 
-    seen_criteria: set[str] = set()
-    for section in sections:
-        if not isinstance(section, dict):
-            raise RuntimeError("Each round 5 section must be an object.")
-
-        criterion = str(section.get("criterion") or "").strip()
-        verdict = str(section.get("verdict") or "").strip().lower()
-        if criterion not in EXPECTED_CRITERIA:
-            raise RuntimeError(f'Unexpected round 5 criterion "{criterion}".')
-        if verdict not in {"strong", "mixed", "weak"}:
-            raise RuntimeError(f'Invalid verdict "{verdict}" in section "{criterion}".')
-        seen_criteria.add(criterion)
-
-        if criterion == "Overview":
-            if not isinstance(section.get("overall_evaluation"), str):
-                raise RuntimeError('"overall_evaluation" must be a string in Overview.')
-            if not isinstance(section.get("key_strengths"), list):
-                raise RuntimeError('"key_strengths" must be an array in Overview.')
-            if not isinstance(section.get("areas_of_improvement"), list):
-                raise RuntimeError('"areas_of_improvement" must be an array in Overview.')
-
-        if criterion == "Pitch Deck Evaluation":
-            if not isinstance(section.get("overall_assessment"), str):
-                raise RuntimeError('"overall_assessment" must be a string in Pitch Deck Evaluation.')
-            lacking_content = section.get("lacking_content")
-            if not isinstance(lacking_content, list):
-                raise RuntimeError('"lacking_content" must be an array in Pitch Deck Evaluation.')
-            for item in lacking_content:
-                if not isinstance(item, dict):
-                    raise RuntimeError("Each lacking_content item must be an object.")
-                if not isinstance(item.get("what"), str) or not isinstance(item.get("why"), str):
-                    raise RuntimeError('Each lacking_content item must include string "what" and "why".')
-
-            structural_flow_issues = section.get("structural_flow_issues")
-            if not isinstance(structural_flow_issues, list):
-                raise RuntimeError('"structural_flow_issues" must be an array in Pitch Deck Evaluation.')
-            for item in structural_flow_issues:
-                if not isinstance(item, dict):
-                    raise RuntimeError("Each structural_flow_issues item must be an object.")
-                if not isinstance(item.get("issue"), str) or not isinstance(item.get("impact"), str):
-                    raise RuntimeError('Each structural_flow_issues item must include string "issue" and "impact".')
-
-            if not isinstance(section.get("recommended_refinements"), list):
-                raise RuntimeError('"recommended_refinements" must be an array in Pitch Deck Evaluation.')
-
-    if seen_criteria != EXPECTED_CRITERIA:
-        raise RuntimeError("Round 5 sections do not match required criteria.")
-
-    return payload
+def _parse_round5_payload(raw_content: str) -> dict:
+    # Prose-wrapped or truncated output goes straight to repair without a
+    # full parse; the schema's root "type": "object" covers the rest.
+    if not looks_like_json_object(raw_content):
+        raise RuntimeError("Round 5 output is not a complete JSON object.")
+    return _validate_round5_schema(orjson.loads(raw_content))
 
 
 def _job_has_uploaded_deck(job) -> bool:
@@ -122,6 +161,10 @@ def _force_no_deck_pitch_section(payload: dict) -> dict:
     return payload
 
 
+def _dumps(value) -> str:
+    return orjson.dumps(value).decode()
+
+
 def _build_round5_user_prompt(
     shared_input: SharedCoachingInput,
     *,
@@ -130,25 +173,14 @@ def _build_round5_user_prompt(
     round3_feedback: dict,
     round4_feedback: dict,
 ) -> str:
-    return (
-        USER_PROMPT_TEMPLATE.replace(
-            "{round1_feedback_json}",
-            json.dumps(round1_feedback, ensure_ascii=False),
-        )
-        .replace(
-            "{round2_feedback_json}",
-            json.dumps(round2_feedback, ensure_ascii=False),
-        )
-        .replace(
-            "{round3_feedback_json}",
-            json.dumps(round3_feedback, ensure_ascii=False),
-        )
-        .replace(
-            "{round4_feedback_json}",
-            json.dumps(round4_feedback, ensure_ascii=False),
-        )
-        .replace("{transcript_full_text}", shared_input.transcript_full_text)
-        .replace("{deck_text_or_empty}", shared_input.deck_text or "")
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        round1_feedback_json=_dumps(round1_feedback),
+        round2_feedback_json=_dumps(round2_feedback),
+        round3_feedback_json=_dumps(round3_feedback),
+        round4_feedback_json=_dumps(round4_feedback),
+        transcript_full_text=shared_input.transcript_full_text,
+        deck_text_or_empty=shared_input.deck_text or "",
     )
 
 
@@ -162,6 +194,11 @@ def _request_round5_output(user_prompt: str) -> str:
     )
 
 
+# The version salt and system prompt never change at runtime, so they are
+# hashed once and each key only feeds the user prompt into a copy.
+_RESULT_KEY_DIGEST = result_key_digest(ROUND_5_VERSION, SYSTEM_PROMPT)
+
+
 def _repair_prompt(invalid_output: str) -> str:
     return (
         "Your previous output was invalid JSON. Return ONLY corrected valid JSON matching "
@@ -170,7 +207,11 @@ def _repair_prompt(invalid_output: str) -> str:
     )
 
 
-def run_round5(job_store: JobStore, job_id: str) -> dict:
+def run_round5(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> dict:
     job_store.update_job(
         job_id,
         feedback_round_5_status="running",
@@ -194,7 +235,14 @@ def run_round5(job_store: JobStore, job_id: str) -> dict:
             raise RuntimeError(f"Round 5 requires completed rounds 1-4. Missing: {joined}.")
         has_uploaded_deck = _job_has_uploaded_deck(job)
 
-        shared_input = load_shared_input(job_store, job_id)
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id, job=job)
+        else:
+            # Reuse the input loaded for rounds 1-4; only the deck text can
+            # have changed while the orchestrator waited for extraction.
+            shared_input = shared_input.model_copy(
+                update={"deck_text": (job_store.get_deck_text(job_id) or "").strip()}
+            )
         user_prompt = _build_round5_user_prompt(
             shared_input,
             round1_feedback=job.feedback_round_1,
@@ -202,13 +250,25 @@ def run_round5(job_store: JobStore, job_id: str) -> dict:
             round3_feedback=job.feedback_round_3,
             round4_feedback=job.feedback_round_4,
         )
-        raw_output = _request_round5_output(user_prompt)
-
-        try:
-            parsed = _validate_round5_schema(_parse_json(raw_output))
-        except Exception:
-            repaired_output = _request_round5_output(_repair_prompt(raw_output))
-            parsed = _validate_round5_schema(_parse_json(repaired_output))
+        # Unchanged Round 1-4 feedback, transcript and deck reuse the
+        # validated result instead of sampling a new completion.
+        cache = get_llm_cache()
+        cache_key = result_cache_key(_RESULT_KEY_DIGEST, "round5_result", user_prompt)
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            parsed = orjson.loads(cached)
+            logger.info("job_id=%s round5_result_cache=hit", job_id)
+        else:
+            raw_output = _request_round5_output(user_prompt)
+
+            try:
+                parsed = _parse_round5_payload(raw_output)
+            except Exception:
+                repaired_output = _request_round5_output(_repair_prompt(raw_output))
+                parsed = _parse_round5_payload(repaired_output)
+
+            if cache is not None:
+                cache.set(cache_key, _dumps(parsed))
 
         if not has_uploaded_deck:
             parsed = _force_no_deck_pitch_section(parsed)
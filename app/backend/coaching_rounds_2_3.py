@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import orjson
+
+from .coaching_input import SharedCoachingInput, load_shared_input
+from .coaching_round2 import (
+    _USER_PROMPT_STATIC_PREFIX as ROUND2_INSTRUCTIONS,
+    _validate_round2_schema,
+    run_round2,
+)
+from .coaching_round3 import (
+    _USER_PROMPT_STATIC_PREFIX as ROUND3_INSTRUCTIONS,
+    _backfill_round3_sentence_text,
+    _validate_round3_schema,
+    run_round3,
+)
+from .llm_gptsapi import request_chat_completion
+from .prompts import compile_template, render_template
+from .prompts.round2 import ROUND_2_VERSION, SYSTEM_PROMPT as ROUND2_SYSTEM_PROMPT
+from .prompts.round3 import ROUND_3_VERSION, SYSTEM_PROMPT as ROUND3_SYSTEM_PROMPT
+from .storage import JobStore
+
+
+logger = logging.getLogger("uvicorn.error")
+
+# Both rounds read the same transcript and deck, so a combined request sends
+# that evidence once instead of once per round.
+SYSTEM_PROMPT = (
+    "You are acting in two coaching roles for the same pitch. Follow each role's "
+    "instructions only for its own report.\n\n"
+    "=== Role for round2 ===\n"
+    f"{ROUND2_SYSTEM_PROMPT}\n\n"
+    "=== Role for round3 ===\n"
+    f"{ROUND3_SYSTEM_PROMPT}"
+)
+
+_USER_PROMPT_STATIC_PREFIX = (
+    "Produce TWO independent reports from the shared evidence at the end.\n"
+    'Return ONE JSON object with exactly two keys, "round2" and "round3", each '
+    "holding the complete JSON object requested by its task.\n\n"
+    '=== Task for "round2" ===\n'
+    f"{ROUND2_INSTRUCTIONS.rstrip()}\n\n"
+    '=== Task for "round3" ===\n'
+    f"{ROUND3_INSTRUCTIONS.rstrip()}\n\n"
+    "=== Shared evidence ===\n"
+)
+_USER_PROMPT_FORMAT = compile_template(
+    _USER_PROMPT_STATIC_PREFIX
+    + """Transcript:
+<<<{transcript_full_text}>>>
+
+Derived timing metrics (JSON):
+<<<{derived_metrics_json}>>>
+
+Per-second energy timeline (sec, text, rms_db, f0_hz):
+<<<{energy_timeline_json}>>>
+
+Per-sentence pacing (sentence, wpm, duration_sec, start, end):
+<<<{sentence_pacing_json}>>>
+
+Deck context:
+<<<{deck_text_or_empty}>>>""",
+    "transcript_full_text",
+    "derived_metrics_json",
+    "energy_timeline_json",
+    "sentence_pacing_json",
+    "deck_text_or_empty",
+)
+
+
+def _build_combined_user_prompt(shared_input: SharedCoachingInput) -> str:
+    derived = shared_input.derived_metrics
+    return render_template(
+        _USER_PROMPT_FORMAT,
+        transcript_full_text=shared_input.transcript_full_text,
+        derived_metrics_json=derived.model_dump_json(),
+        energy_timeline_json=derived.energy_timeline_json,
+        sentence_pacing_json=derived.sentence_pacing_json,
+        deck_text_or_empty=shared_input.deck_text or "",
+    )
+
+
+def _request_combined_output(user_prompt: str) -> str:
+    return request_chat_completion(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=0.3,
+        max_tokens=4700,
+        response_format={"type": "json_object"},
+        cacheable_user_prefix=_USER_PROMPT_STATIC_PREFIX,
+        # Reuse completions for identical prompts once both halves validate.
+        cache_sampled=True,
+        cache_validate=_split_combined_output,
+    )
+
+
+def _repair_prompt(invalid_output: str) -> str:
+    return (
+        "Your previous output was invalid JSON. Return ONLY corrected valid JSON with the "
+        'keys "round2" and "round3" matching their schemas. Here is the invalid output:\n'
+        f"<<<{invalid_output}>>>"
+    )
+
+
+def _split_combined_output(raw_output: str) -> tuple[dict, dict]:
+    parsed = orjson.loads(raw_output)
+    if not isinstance(parsed, dict):
+        raise RuntimeError("Combined Round 2/3 JSON root must be an object.")
+    round2 = parsed.get("round2")
+    round3 = parsed.get("round3")
+    if not isinstance(round2, dict) or not isinstance(round3, dict):
+        raise RuntimeError('Combined Round 2/3 payload must contain "round2" and "round3" objects.')
+    return _validate_round2_schema(round2), _validate_round3_schema(round3)
+
+
+def _has_tone_metrics(shared_input: SharedCoachingInput) -> bool:
+    metrics = shared_input.derived_metrics
+    return bool(metrics.energy_timeline) or bool(metrics.sentence_pacing)
+
+
+def _run_separately(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput],
+) -> tuple[dict, dict]:
+    round2: Optional[dict] = None
+    first_error: Optional[Exception] = None
+    try:
+        round2 = run_round2(job_store, job_id, shared_input)
+    except Exception as exc:
+        first_error = exc
+    try:
+        round3 = run_round3(job_store, job_id, shared_input)
+    except Exception:
+        if first_error is None:
+            raise
+    if first_error is not None:
+        raise first_error
+    return round2, round3
+
+
+def run_rounds_2_and_3(
+    job_store: JobStore,
+    job_id: str,
+    shared_input: Optional[SharedCoachingInput] = None,
+) -> tuple[dict, dict]:
+    """Run Round 2 and Round 3 with one LLM request.
+
+    Falls back to the single-round runners when tone metrics are missing
+    or the combined response cannot be validated, so each round still
+    records its own status and error.
+    """
+    job_store.update_job(
+        job_id,
+        feedback_round_2_status="running",
+        feedback_round_2_error=None,
+        feedback_round_2_version=ROUND_2_VERSION,
+        feedback_round_3_status="running",
+        feedback_round_3_error=None,
+        feedback_round_3_version=ROUND_3_VERSION,
+    )
+
+    try:
+        if shared_input is None:
+            shared_input = load_shared_input(job_store, job_id)
+    except Exception:
+        return _run_separately(job_store, job_id, None)
+    if not _has_tone_metrics(shared_input):
+        return _run_separately(job_store, job_id, shared_input)
+
+    try:
+        raw_output = _request_combined_output(_build_combined_user_prompt(shared_input))
+        try:
+            round2, round3 = _split_combined_output(raw_output)
+        except Exception:
+            repaired_output = _request_combined_output(_repair_prompt(raw_output))
+            round2, round3 = _split_combined_output(repaired_output)
+    except Exception as exc:
+        logger.warning(
+            "job_id=%s rounds23_combined_failed falling_back=separate error=%s",
+            job_id,
+            exc,
+        )
+        return _run_separately(job_store, job_id, shared_input)
+
+    round3 = _backfill_round3_sentence_text(round3, shared_input.words)
+    job_store.update_job(
+        job_id,
+        feedback_round_2=round2,
+        feedback_round_2_version=ROUND_2_VERSION,
+        feedback_round_2_status="done",
+        feedback_round_2_error=None,
+        feedback_round_3=round3,
+        feedback_round_3_version=ROUND_3_VERSION,
+        feedback_round_3_status="done",
+        feedback_round_3_error=None,
+    )
+    logger.info("job_id=%s rounds23_feedback_done combined=true", job_id)
+    return round2, round3
@@ -1,13 +1,20 @@
+import io
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from pypdf import PdfReader
 from pptx import Presentation
 
 
 SUPPORTED_DECK_EXTENSIONS = {".pdf", ".pptx", ".ppt"}
+# Below this many pages, opening extra readers costs more than it saves.
+PDF_PARALLEL_MIN_PAGES = 4
+PDF_PARALLEL_MAX_WORKERS = 4
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r"[^A-Za-z0-9._-]")
 
 
 @dataclass
@@ -17,8 +24,16 @@ class DeckExtractionResult:
     num_pages_or_slides: int
 
 
+def _split_stem_ext(name: str) -> tuple[str, str]:
+    """Split a bare file name like ``Path.stem`` / ``Path.suffix`` would."""
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[:dot], name[dot:]
+    return name, ""
+
+
 def detect_extension(filename: str) -> str:
-    return Path(filename or "").suffix.lower()
+    return _split_stem_ext(Path(filename or "").name)[1].lower()
 
 
 def sanitize_filename(filename: str) -> str:
@@ -26,12 +41,13 @@ def sanitize_filename(filename: str) -> str:
     if candidate in {"", ".", ".."}:
         candidate = "deck"
 
-    sanitized = re.sub(r"[^A-Za-z0-9._-]", "_", candidate)
+    sanitized = _UNSAFE_FILENAME_CHARS_RE.sub("_", candidate)
     if sanitized in {"", ".", ".."}:
         sanitized = "deck"
 
-    stem = Path(sanitized).stem[:120] or "deck"
-    ext = Path(sanitized).suffix[:20]
+    stem, ext = _split_stem_ext(sanitized)
+    stem = stem[:120] or "deck"
+    ext = ext[:20]
     return f"{stem}{ext}"
 
 
@@ -42,8 +58,9 @@ def validate_deck_extension(extension: str) -> None:
         raise ValueError("Legacy .ppt is not supported yet. Please upload PDF or PPTX.")
 
 
-def extract_deck_text(deck_path: Path) -> DeckExtractionResult:
-    extension = deck_path.suffix.lower()
+def extract_deck_text(deck_path: Path, extension: Optional[str] = None) -> DeckExtractionResult:
+    if extension is None:
+        extension = deck_path.suffix.lower()
     if extension == ".pdf":
         return _extract_pdf(deck_path)
     if extension == ".pptx":
@@ -53,18 +70,39 @@ def extract_deck_text(deck_path: Path) -> DeckExtractionResult:
     raise ValueError("Unsupported deck format. Please upload PDF or PPTX.")
 
 
+def _extract_pdf_page_range(deck_path: Path, start: int, stop: int) -> List[str]:
+    # PdfReader resolves objects lazily from one shared stream and is not
+    # thread-safe, so each worker reads its page range through its own reader.
+    reader = PdfReader(str(deck_path))
+    return [(reader.pages[i].extract_text() or "").strip() for i in range(start, stop)]
+
+
+def _extract_pdf_page_texts(deck_path: Path, reader: PdfReader) -> List[str]:
+    page_count = len(reader.pages)
+    workers = min(PDF_PARALLEL_MAX_WORKERS, os.cpu_count() or 1, page_count)
+    if page_count < PDF_PARALLEL_MIN_PAGES or workers < 2:
+        return [(page.extract_text() or "").strip() for page in reader.pages]
+
+    step = -(-page_count // workers)
+    bounds = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix="deck_pdf") as pool:
+        chunks = pool.map(lambda b: _extract_pdf_page_range(deck_path, *b), bounds)
+        return [text for chunk in chunks for text in chunk]
+
+
 def _extract_pdf(deck_path: Path) -> DeckExtractionResult:
     reader = PdfReader(str(deck_path))
     entries: List[dict] = []
-    merged: List[str] = []
+    merged = io.StringIO()
 
-    for index, page in enumerate(reader.pages, start=1):
-        text = (page.extract_text() or "").strip()
+    for index, text in enumerate(_extract_pdf_page_texts(deck_path, reader), start=1):
         entries.append({"index": index, "text": text})
-        merged.append(f"PAGE {index}: {text}")
+        if index > 1:
+            merged.write("\n\n")
+        merged.write(f"PAGE {index}: {text}")
 
     return DeckExtractionResult(
-        extracted_text="\n\n".join(merged).strip(),
+        extracted_text=merged.getvalue().strip(),
         extracted_json=entries,
         num_pages_or_slides=len(reader.pages),
     )
@@ -73,7 +111,7 @@ def _extract_pdf(deck_path: Path) -> DeckExtractionResult:
 def _extract_pptx(deck_path: Path) -> DeckExtractionResult:
     presentation = Presentation(str(deck_path))
     entries: List[dict] = []
-    merged: List[str] = []
+    merged = io.StringIO()
 
     for index, slide in enumerate(presentation.slides, start=1):
         text_chunks: List[str] = []
@@ -84,10 +122,12 @@ def _extract_pptx(deck_path: Path) -> DeckExtractionResult:
 
         slide_text = "\n".join(chunk for chunk in text_chunks if chunk).strip()
         entries.append({"index": index, "text": slide_text})
-        merged.append(f"SLIDE {index}: {slide_text}")
+        if index > 1:
+            merged.write("\n\n")
+        merged.write(f"SLIDE {index}: {slide_text}")
 
     return DeckExtractionResult(
-        extracted_text="\n\n".join(merged).strip(),
+        extracted_text=merged.getvalue().strip(),
         extracted_json=entries,
         num_pages_or_slides=len(presentation.slides),
     )
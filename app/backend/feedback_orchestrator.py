@@ -4,13 +4,16 @@ import logging
 import os
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Optional
 
+from .coaching_input import SharedCoachingInput, load_shared_input
 from .coaching_round1 import run_round1
 from .coaching_round2 import run_round2
 from .coaching_round3 import run_round3
 from .coaching_round4 import run_round4
 from .coaching_round5 import run_round5
+from .coaching_rounds_2_3 import run_rounds_2_and_3
 from .storage import JobStore
 
 
@@ -23,8 +26,37 @@ ROUND_RUNNERS = {
     4: run_round4,
 }
 
-_active_jobs_lock = threading.Lock()
-_active_jobs: set[str] = set()
+# (status attribute, payload attribute) on JobRecord for each round.
+_ROUND_ATTRS = {
+    round_number: (f"feedback_round_{round_number}_status", f"feedback_round_{round_number}")
+    for round_number in (1, 2, 3, 4, 5)
+}
+
+
+def _feedback_pool_workers() -> int:
+    try:
+        return max(1, int(os.getenv("FEEDBACK_POOL_WORKERS", "8")))
+    except ValueError:
+        return 8
+
+
+# Shared across orchestrations so each job reuses warm worker threads
+# instead of starting and joining a fresh pool.
+_ROUND_POOL = ThreadPoolExecutor(
+    max_workers=_feedback_pool_workers(),
+    thread_name_prefix="feedback_round",
+)
+
+# Active job ids are split across shards so bursts of submissions for
+# different jobs do not all serialize on one lock.
+_ACTIVE_JOB_SHARDS = 16
+_active_job_shards: list[tuple[threading.Lock, set[str]]] = [
+    (threading.Lock(), set()) for _ in range(_ACTIVE_JOB_SHARDS)
+]
+
+
+def _active_job_shard(job_id: str) -> tuple[threading.Lock, set[str]]:
+    return _active_job_shards[hash(job_id) % _ACTIVE_JOB_SHARDS]
 
 
 def _has_transcript(job) -> bool:
@@ -34,9 +66,13 @@ def _has_transcript(job) -> bool:
 
 
 def _round_done(job, round_number: int) -> bool:
-    status = getattr(job, f"feedback_round_{round_number}_status", None)
-    payload = getattr(job, f"feedback_round_{round_number}", None)
-    return status == "done" and isinstance(payload, dict)
+    status_attr, payload_attr = _ROUND_ATTRS[round_number]
+    return getattr(job, status_attr, None) == "done" and isinstance(getattr(job, payload_attr, None), dict)
+
+
+def _combine_rounds_2_3() -> bool:
+    raw = os.getenv("FEEDBACK_COMBINE_ROUNDS_2_3", "false").strip().lower()
+    return raw in {"1", "true", "yes", "on"}
 
 
 def _round5_deck_wait_seconds() -> float:
@@ -100,11 +136,29 @@ def _wait_for_deck_if_pending(job_store: JobStore, job_id: str, source: str):
     return latest
 
 
+def _load_shared_input_once(job_store: JobStore, job_id: str, source: str) -> Optional[SharedCoachingInput]:
+    """Load the coaching input once for all concurrent rounds.
+
+    On failure each round falls back to loading it itself, so the error is
+    still recorded against every round.
+    """
+    try:
+        return load_shared_input(job_store, job_id)
+    except Exception as exc:
+        logger.warning(
+            "job_id=%s feedback_orchestration_shared_input_failed source=%s error=%s",
+            job_id,
+            source,
+            exc,
+        )
+        return None
+
+
 def _missing_prerequisites(job) -> list[str]:
     missing: list[str] = []
     for round_number in (1, 2, 3, 4):
         if not _round_done(job, round_number):
-            status = getattr(job, f"feedback_round_{round_number}_status", "pending")
+            status = getattr(job, _ROUND_ATTRS[round_number][0], "pending")
             missing.append(f"round{round_number} ({status})")
     return missing
 
@@ -146,65 +200,89 @@ def _run_feedback_orchestration(job_store: JobStore, job_id: str, source: str) -
             rounds_to_run,
         )
 
+        shared_input: Optional[SharedCoachingInput] = None
         if rounds_to_run:
-            with ThreadPoolExecutor(max_workers=4) as pool:
-                futures = {
-                    pool.submit(ROUND_RUNNERS[round_number], job_store, job_id): round_number
-                    for round_number in rounds_to_run
-                }
-
-                for future in as_completed(futures):
-                    round_number = futures[future]
-                    try:
-                        future.result()
-                        logger.info(
-                            "job_id=%s feedback_round_completed round=%s source=%s",
-                            job_id,
-                            round_number,
-                            source,
-                        )
-                    except Exception as exc:
-                        if first_failed_round is None:
-                            first_failed_round = round_number
-                            logger.warning(
-                                "job_id=%s feedback_orchestration_first_failure round=%s source=%s error=%s",
-                                job_id,
-                                round_number,
-                                source,
-                                exc,
-                            )
-                            for other_future, other_round in futures.items():
-                                if other_future is future:
-                                    continue
-                                if other_future.done():
-                                    continue
-                                cancelled = other_future.cancel()
-                                logger.info(
-                                    "job_id=%s feedback_orchestration_cancel_attempt target_round=%s cancelled=%s source=%s",
-                                    job_id,
-                                    other_round,
-                                    cancelled,
-                                    source,
-                                )
-                        else:
-                            logger.warning(
-                                "job_id=%s feedback_orchestration_additional_failure round=%s source=%s error=%s",
-                                job_id,
-                                round_number,
-                                source,
-                                exc,
-                            )
-
-        latest = job_store.get_job(job_id)
-        if not latest:
-            logger.warning(
-                "job_id=%s feedback_orchestration_abort reason=job_missing_after_rounds source=%s",
-                job_id,
-                source,
-            )
-            return
+            shared_input = _load_shared_input_once(job_store, job_id, source)
+            runners = dict(ROUND_RUNNERS)
+            if _combine_rounds_2_3() and 2 in rounds_to_run and 3 in rounds_to_run:
+                # One request covers both rounds; its future is reported as round 2.
+                runners[2] = run_rounds_2_and_3
+                rounds_to_run = [r for r in rounds_to_run if r != 3]
+            futures = {
+                _ROUND_POOL.submit(
+                    runners[round_number],
+                    job_store,
+                    job_id,
+                    # Shallow copies: round 4 swaps in recomputed metrics.
+                    shared_input.model_copy() if shared_input is not None else None,
+                ): round_number
+                for round_number in rounds_to_run
+            }
+
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                exc = future.exception()
+                if exc is not None and first_failed_round is None:
+                    first_failed_round = futures[future]
+                    logger.warning(
+                        "job_id=%s feedback_orchestration_first_failure round=%s source=%s error=%s",
+                        job_id,
+                        first_failed_round,
+                        source,
+                        exc,
+                    )
+
+            if first_failed_round is not None:
+                # Drop siblings still queued in the shared pool, then let the
+                # running ones finish so they record their own round status.
+                for other_future in pending:
+                    cancelled = other_future.cancel()
+                    logger.info(
+                        "job_id=%s feedback_orchestration_cancel_attempt target_round=%s cancelled=%s source=%s",
+                        job_id,
+                        futures[other_future],
+                        cancelled,
+                        source,
+                    )
+                wait(pending)
+
+            for future, round_number in futures.items():
+                if future.cancelled() or round_number == first_failed_round:
+                    continue
+                exc = future.exception()
+                if exc is None:
+                    logger.info(
+                        "job_id=%s feedback_round_completed round=%s source=%s",
+                        job_id,
+                        round_number,
+                        source,
+                    )
+                else:
+                    logger.warning(
+                        "job_id=%s feedback_orchestration_additional_failure round=%s source=%s error=%s",
+                        job_id,
+                        round_number,
+                        source,
+                        exc,
+                    )
+
+        if first_failed_round is None:
+            # Every round was already done or just stored its payload, so the
+            # prerequisites hold without re-reading the job; the deck wait
+            # below fetches a fresh copy before Round 5 runs.
+            latest = job
+            missing: list[str] = []
+        else:
+            latest = job_store.get_job(job_id)
+            if not latest:
+                logger.warning(
+                    "job_id=%s feedback_orchestration_abort reason=job_missing_after_rounds source=%s",
+                    job_id,
+                    source,
+                )
+                return
+            missing = _missing_prerequisites(latest)
 
-        missing = _missing_prerequisites(latest)
         if first_failed_round is not None or missing:
             if _round_done(latest, 5):
                 logger.info(
@@ -248,7 +326,7 @@ def _run_feedback_orchestration(job_store: JobStore, job_id: str, source: str) -
             return
 
         logger.info("job_id=%s feedback_orchestration_round5_start source=%s", job_id, source)
-        run_round5(job_store, job_id)
+        run_round5(job_store, job_id, shared_input)
         logger.info("job_id=%s feedback_orchestration_round5_done source=%s", job_id, source)
     except Exception:
         logger.error(
@@ -259,8 +337,9 @@ def _run_feedback_orchestration(job_store: JobStore, job_id: str, source: str) -
         )
     finally:
         elapsed_ms = int((time.monotonic() - start_ts) * 1000)
-        with _active_jobs_lock:
-            _active_jobs.discard(job_id)
+        lock, active_jobs = _active_job_shard(job_id)
+        with lock:
+            active_jobs.discard(job_id)
         logger.info(
             "job_id=%s feedback_orchestration_finished source=%s elapsed_ms=%s",
             job_id,
@@ -270,15 +349,16 @@ def _run_feedback_orchestration(job_store: JobStore, job_id: str, source: str) -
 
 
 def ensure_feedback_orchestration_started(job_store: JobStore, job_id: str, source: str) -> bool:
-    with _active_jobs_lock:
-        if job_id in _active_jobs:
+    lock, active_jobs = _active_job_shard(job_id)
+    with lock:
+        if job_id in active_jobs:
             logger.info(
                 "job_id=%s feedback_orchestration_already_running source=%s",
                 job_id,
                 source,
             )
             return False
-        _active_jobs.add(job_id)
+        active_jobs.add(job_id)
 
     thread = threading.Thread(
         target=_run_feedback_orchestration,
@@ -1,9 +1,9 @@
 import base64
-import json
 import os
-from functools import lru_cache
-from typing import Optional
+from functools import cache
+from typing import Optional, Union
 
+import orjson
 from google.oauth2 import service_account
 
 
@@ -23,13 +23,13 @@ def _decode_base64_json(encoded: str) -> dict:
             "GOOGLE_APPLICATION_CREDENTIALS_B64 is not valid base64."
         ) from exc
 
-    return _parse_service_account_json(decoded.decode("utf-8"), "GOOGLE_APPLICATION_CREDENTIALS_B64")
+    return _parse_service_account_json(decoded, "GOOGLE_APPLICATION_CREDENTIALS_B64")
 
 
-def _parse_service_account_json(raw_json: str, source: str) -> dict:
+def _parse_service_account_json(raw_json: Union[str, bytes], source: str) -> dict:
     try:
-        parsed = json.loads(raw_json)
-    except json.JSONDecodeError as exc:
+        parsed = orjson.loads(raw_json)
+    except orjson.JSONDecodeError as exc:
         raise RuntimeError(f"{source} does not contain valid JSON.") from exc
 
     if not isinstance(parsed, dict):
@@ -37,7 +37,7 @@ def _parse_service_account_json(raw_json: str, source: str) -> dict:
     return parsed
 
 
-@lru_cache(maxsize=1)
+@cache
 def get_gcp_credentials() -> Optional[service_account.Credentials]:
     env_b64 = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_B64", "").strip()
     if env_b64:
@@ -69,6 +69,7 @@ def get_gcp_credentials() -> Optional[service_account.Credentials]:
     return None
 
 
+@cache
 def get_project_id_hint() -> Optional[str]:
     explicit = os.getenv("GCP_PROJECT_ID", "").strip()
     if explicit:
@@ -1,11 +1,15 @@
 import logging
 import os
-import json
+import random
+import time
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
-from google.api_core.exceptions import NotFound
+import orjson
+import requests
+from google.api_core.exceptions import NotFound, ServerError, TooManyRequests
 from google.cloud import storage
 
 from .gcp_auth import CLOUD_PLATFORM_SCOPE, get_gcp_credentials, get_project_id_hint
@@ -13,6 +17,18 @@ from .gcp_auth import CLOUD_PLATFORM_SCOPE, get_gcp_credentials, get_project_id_
 
 logger = logging.getLogger("uvicorn.error")
 _storage_client: Optional[storage.Client] = None
+# GCS accepts up to 100 calls per batch request.
+DELETE_BATCH_SIZE = 100
+# Transient failures worth another upload attempt; 4xx errors are permanent.
+_RETRYABLE_UPLOAD_ERRORS = (
+    ServerError,
+    TooManyRequests,
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+UPLOAD_RETRY_MAX_DELAY_SECONDS = 30.0
 
 
 def get_default_bucket() -> str:
@@ -34,6 +50,12 @@ def get_storage_client() -> storage.Client:
     return _storage_client
 
 
+@lru_cache(maxsize=32)
+def _bucket(name: str) -> storage.Bucket:
+    """Return a reusable bucket handle; building one makes no request."""
+    return get_storage_client().bucket(name)
+
+
 def normalize_blob_path(blob_path: str) -> str:
     return blob_path.lstrip("/")
 
@@ -45,19 +67,17 @@ def build_gs_uri(bucket: str, blob_path: str) -> str:
 def parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
     if not gcs_uri.startswith("gs://"):
         raise ValueError(f"Invalid GCS URI: {gcs_uri}")
-    remainder = gcs_uri[5:]
-    if "/" not in remainder:
+    bucket, sep, blob_path = gcs_uri[5:].partition("/")
+    if not sep:
         raise ValueError(f"GCS URI is missing object path: {gcs_uri}")
-    bucket, blob_path = remainder.split("/", 1)
     if not bucket or not blob_path:
         raise ValueError(f"Invalid GCS URI: {gcs_uri}")
     return bucket, blob_path
 
 
 def upload_bytes(bucket: str, blob_path: str, data: bytes, content_type: str) -> str:
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob = client.bucket(bucket).blob(clean_path)
+    blob = _bucket(bucket).blob(clean_path)
     blob.upload_from_string(data, content_type=content_type)
     return build_gs_uri(bucket, clean_path)
 
@@ -73,11 +93,10 @@ def upload_text(
 
 
 def upload_json(bucket: str, blob_path: str, obj) -> str:
-    payload = json.dumps(obj, ensure_ascii=False)
     return upload_bytes(
         bucket,
         blob_path,
-        payload.encode("utf-8"),
+        orjson.dumps(obj),
         content_type="application/json",
     )
 
@@ -85,9 +104,8 @@ def upload_json(bucket: str, blob_path: str, obj) -> str:
 def upload_file(bucket: str, blob_path: str, local_path: Path, content_type: str) -> str:
     if not local_path.exists():
         raise FileNotFoundError(f"Local file does not exist: {local_path}")
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob = client.bucket(bucket).blob(clean_path)
+    blob = _bucket(bucket).blob(clean_path)
     blob.upload_from_filename(str(local_path), content_type=content_type)
     return build_gs_uri(bucket, clean_path)
 
@@ -107,9 +125,8 @@ def upload_file_resumable(
     """
     if not local_path.exists():
         raise FileNotFoundError(f"Local file does not exist: {local_path}")
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob = client.bucket(bucket).blob(clean_path, chunk_size=chunk_size)
+    blob = _bucket(bucket).blob(clean_path, chunk_size=chunk_size)
 
     last_error: Exception | None = None
     for attempt in range(max_retries):
@@ -120,7 +137,7 @@ def upload_file_resumable(
                 timeout=300,  # 5-minute timeout per chunk
             )
             return build_gs_uri(bucket, clean_path)
-        except Exception as exc:
+        except _RETRYABLE_UPLOAD_ERRORS as exc:
             last_error = exc
             logger.warning(
                 "Resumable upload attempt %d/%d failed for gs://%s/%s: %s",
@@ -132,33 +149,34 @@ def upload_file_resumable(
             )
             if attempt + 1 >= max_retries:
                 break
+            # Capped exponential backoff with jitter so a transient outage
+            # is not hit again immediately by every concurrent upload.
+            time.sleep(min(2**attempt + random.uniform(0, 0.5), UPLOAD_RETRY_MAX_DELAY_SECONDS))
     raise last_error or RuntimeError(f"Upload failed after {max_retries} attempts")
 
 
 def download_text(bucket: str, blob_path: str) -> str:
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob = client.bucket(bucket).blob(clean_path)
-    if not blob.exists():
-        raise FileNotFoundError(f"GCS object not found: gs://{bucket}/{clean_path}")
-    return blob.download_as_text()
+    blob = _bucket(bucket).blob(clean_path)
+    try:
+        return blob.download_as_text()
+    except NotFound as exc:
+        raise FileNotFoundError(f"GCS object not found: gs://{bucket}/{clean_path}") from exc
 
 
 def list_blobs(prefix: str, bucket: Optional[str] = None) -> list[str]:
     bucket_name = bucket or get_default_bucket()
-    client = get_storage_client()
     clean_prefix = normalize_blob_path(prefix)
     return sorted(
         blob.name
-        for blob in client.list_blobs(bucket_name, prefix=clean_prefix)
+        for blob in get_storage_client().list_blobs(_bucket(bucket_name), prefix=clean_prefix)
         if blob.name and not blob.name.endswith("/")
     )
 
 
 def delete_blob(bucket: str, blob_path: str) -> None:
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob = client.bucket(bucket).blob(clean_path)
+    blob = _bucket(bucket).blob(clean_path)
     try:
         blob.delete()
     except NotFound:
@@ -172,23 +190,38 @@ def delete_blob(bucket: str, blob_path: str) -> None:
         )
 
 
+def _delete_listed_blob(bucket_name: str, blob: storage.Blob) -> None:
+    try:
+        blob.delete()
+    except NotFound:
+        return
+    except Exception:
+        logger.warning(
+            "Failed deleting GCS object during prefix cleanup: gs://%s/%s",
+            bucket_name,
+            blob.name,
+            exc_info=True,
+        )
+
+
 def delete_prefix(prefix: str, bucket: Optional[str] = None) -> None:
     bucket_name = bucket or get_default_bucket()
-    client = get_storage_client()
     clean_prefix = normalize_blob_path(prefix)
-    blobs = list(client.list_blobs(bucket_name, prefix=clean_prefix))
-    for blob in blobs:
+    client = get_storage_client()
+    blobs = list(client.list_blobs(_bucket(bucket_name), prefix=clean_prefix))
+    for start in range(0, len(blobs), DELETE_BATCH_SIZE):
+        chunk = blobs[start : start + DELETE_BATCH_SIZE]
         try:
-            blob.delete()
-        except NotFound:
-            continue
+            # Sends the chunk's DELETE calls as one multipart batch request.
+            with client.batch():
+                for blob in chunk:
+                    blob.delete()
         except Exception:
-            logger.warning(
-                "Failed deleting GCS object during prefix cleanup: gs://%s/%s",
-                bucket_name,
-                blob.name,
-                exc_info=True,
-            )
+            # Any failed call (including an already-missing object) fails the
+            # whole batch; retry the chunk one by one so missing objects are
+            # skipped and real errors are logged per object.
+            for blob in chunk:
+                _delete_listed_blob(bucket_name, blob)
 
 
 def generate_signed_upload_url(
@@ -201,9 +234,8 @@ def generate_signed_upload_url(
     into GCS, bypassing the app server entirely."""
     from .gcp_auth import get_gcp_credentials
 
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob_obj = client.bucket(bucket).blob(clean_path)
+    blob_obj = _bucket(bucket).blob(clean_path)
     credentials = get_gcp_credentials()
     try:
         return blob_obj.generate_signed_url(
@@ -257,13 +289,16 @@ def generate_signed_upload_url(
 
 def download_blob_to_file(bucket: str, blob_path: str, local_path: Path) -> None:
     """Download a GCS object to a local file."""
-    client = get_storage_client()
     clean_path = normalize_blob_path(blob_path)
-    blob_obj = client.bucket(bucket).blob(clean_path)
-    if not blob_obj.exists():
-        raise FileNotFoundError(f"GCS object not found: gs://{bucket}/{clean_path}")
+    blob_obj = _bucket(bucket).blob(clean_path)
     local_path.parent.mkdir(parents=True, exist_ok=True)
-    blob_obj.download_to_filename(str(local_path))
+    # A missing object surfaces as NotFound from the download itself, which
+    # saves the separate metadata request an exists() check would cost.
+    try:
+        blob_obj.download_to_filename(str(local_path))
+    except NotFound as exc:
+        local_path.unlink(missing_ok=True)
+        raise FileNotFoundError(f"GCS object not found: gs://{bucket}/{clean_path}") from exc
 
 
 def ensure_bucket_cors(bucket: str) -> None:
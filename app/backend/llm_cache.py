@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Protocol, Tuple
+
+try:
+    import redis
+except Exception:  # pragma: no cover - only relevant when Redis caching is enabled.
+    redis = None
+
+
+DEFAULT_TTL_SECONDS = 86400
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        pass
+
+
+class InMemoryLRUBackend:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    def __init__(self, redis_url: str, *, prefix: str = "llm_cache:") -> None:
+        if redis is None:
+            raise RuntimeError("redis is required when LLM_CACHE_REDIS_URL is set.")
+        self._client = redis.Redis.from_url(redis_url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self._prefix + key)
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(self._prefix + key, value, ex=ttl)
+
+
+class LLMCache:
+    """Content-addressed cache for raw LLM completions."""
+
+    def __init__(self, backend: CacheBackend, *, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        self._backend = backend
+        self._ttl = ttl
+
+    @staticmethod
+    def make_key(
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: Optional[float] = None,
+        response_format: Optional[dict] = None,
+    ) -> str:
+        material = json.dumps(
+            {
+                "system_prompt": system_prompt,
+                "user_prompt": user_prompt,
+                "model": model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "response_format": response_format,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._backend.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self._backend.set(key, value, self._ttl if ttl is None else ttl)
+
+    def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], str],
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """Return the cached value or compute it; when ``validate`` is given,
+        only values it accepts (does not raise on) are stored."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = call()
+        if validate is not None:
+            try:
+                validate(value)
+            except Exception:
+                return value
+        self.set(key, value)
+        return value
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def build_llm_cache() -> Optional[LLMCache]:
+    if not _bool_env("LLM_CACHE_ENABLED", False):
+        return None
+    ttl = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+    redis_url = os.getenv("LLM_CACHE_REDIS_URL", "").strip()
+    if redis_url:
+        return LLMCache(RedisBackend(redis_url), ttl=ttl)
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+    return LLMCache(InMemoryLRUBackend(max_entries), ttl=ttl)
+
+
+_cache: Optional[LLMCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, or ``None`` when caching is disabled."""
+    global _cache, _cache_loaded
+    with _cache_lock:
+        if not _cache_loaded:
+            _cache = build_llm_cache()
+            _cache_loaded = True
+        return _cache
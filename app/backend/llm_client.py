@@ -1,11 +1,15 @@
 import os
-from typing import Any
+import threading
+from typing import Any, Optional
 
 from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI
 
 
 DEFAULT_BASE_URL = "https://api.gptsapi.net/v1"
 DEFAULT_MODEL = "gpt-5.1-chat"
+_client: Optional[OpenAI] = None
+_client_key: Optional[tuple[str, str, float]] = None
+_client_lock = threading.Lock()
 
 
 def _get_api_key() -> str:
@@ -19,13 +23,21 @@ def _get_api_key() -> str:
 
 
 def _build_client() -> OpenAI:
+    """Return a shared client so its HTTP connection pool is reused across
+    calls; rebuilt only when the settings change."""
+    global _client, _client_key
     base_url = os.getenv("GPTSAPI_BASE_URL", DEFAULT_BASE_URL).strip() or DEFAULT_BASE_URL
     timeout_seconds = float(os.getenv("GPTSAPI_TIMEOUT_SECONDS", "60"))
-    return OpenAI(
-        base_url=base_url,
-        api_key=_get_api_key(),
-        timeout=timeout_seconds,
-    )
+    key = (base_url, _get_api_key(), timeout_seconds)
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = OpenAI(
+                base_url=base_url,
+                api_key=key[1],
+                timeout=timeout_seconds,
+            )
+            _client_key = key
+        return _client
 
 
 def _extract_content(value: Any) -> str:
@@ -47,6 +59,24 @@ def _is_temperature_unsupported(exc: APIStatusError) -> bool:
     return "temperature" in message and "default (1)" in message
 
 
+def collect_stream_content(stream) -> Optional[str]:
+    """Accumulate streamed delta chunks and join them once at the end;
+    ``None`` means the stream carried no choices at all."""
+    parts: list[str] = []
+    saw_choice = False
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            saw_choice = True
+            delta = chunk.choices[0].delta
+            if delta is not None and delta.content:
+                parts.append(delta.content)
+    finally:
+        stream.close()
+    return "".join(parts) if saw_choice else None
+
+
 def run_llm_test_prompt(transcript_text: str) -> str:
     transcript = (transcript_text or "").strip()
     if not transcript:
@@ -71,19 +101,23 @@ def run_llm_test_prompt(transcript_text: str) -> str:
     }
 
     try:
-        response = client.chat.completions.create(
-            **request_kwargs,
-            temperature=0.3,
-        )
+        try:
+            stream = client.chat.completions.create(
+                **request_kwargs,
+                temperature=0.3,
+                stream=True,
+            )
+        except APIStatusError as exc:
+            if not _is_temperature_unsupported(exc):
+                raise
+            stream = client.chat.completions.create(**request_kwargs, stream=True)
+        streamed = collect_stream_content(stream)
     except APIStatusError as exc:
-        if _is_temperature_unsupported(exc):
-            response = client.chat.completions.create(**request_kwargs)
-        else:
-            provider_message = getattr(exc, "message", str(exc))
-            status_code = getattr(exc, "status_code", None)
-            if status_code is not None:
-                raise RuntimeError(f"GPTsAPI request failed ({status_code}): {provider_message}") from exc
-            raise RuntimeError(f"GPTsAPI request failed: {provider_message}") from exc
+        provider_message = getattr(exc, "message", str(exc))
+        status_code = getattr(exc, "status_code", None)
+        if status_code is not None:
+            raise RuntimeError(f"GPTsAPI request failed ({status_code}): {provider_message}") from exc
+        raise RuntimeError(f"GPTsAPI request failed: {provider_message}") from exc
     except APITimeoutError as exc:
         raise RuntimeError("LLM request timed out while calling GPTsAPI.") from exc
     except APIConnectionError as exc:
@@ -91,15 +125,10 @@ def run_llm_test_prompt(transcript_text: str) -> str:
     except Exception as exc:
         raise RuntimeError(f"Unexpected LLM error: {exc}") from exc
 
-    try:
-        choice = response.choices[0] if response.choices else None
-    except Exception as exc:
-        raise RuntimeError(f"Unexpected LLM response shape: {exc}") from exc
-
-    if choice is None:
+    if streamed is None:
         raise RuntimeError("GPTsAPI returned no choices.")
 
-    content = _extract_content(choice.message.content)
+    content = _extract_content(streamed)
     if not content:
         raise RuntimeError("GPTsAPI returned an empty response.")
     return content
@@ -1,15 +1,36 @@
 import json
 import os
-from typing import Any, Dict, List
+import threading
+from typing import Any, Callable, Dict, List, Optional
 
 import httpx
 
+from .llm_cache import LLMCache, get_llm_cache
+from .prompts import compile_template, render_template
+
 
 DEFAULT_BASE_URL = "https://api.gptsapi.net/v1"
 DEFAULT_MODEL = "gpt-5.1-chat"
 DEFAULT_TIMEOUT_SECONDS = 120.0
 MAX_PROVIDER_ERROR_CHARS = 1200
 
+def _max_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+    except ValueError:
+        return 8
+
+
+# Caps in-flight provider requests across all jobs and rounds so a burst of
+# orchestrations queues locally instead of tripping provider rate limits.
+LLM_REQUEST_SLOTS = threading.BoundedSemaphore(_max_concurrency())
+
+# Shared across rounds and jobs so the original call and its repair retry
+# reuse pooled keep-alive connections instead of a fresh TCP+TLS handshake.
+_HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+)
+
 SYSTEM_PROMPT = (
     "You are an expert pitch analyst. Return ONLY valid JSON. No markdown. "
     "No code fences. No extra text. Use double quotes for all JSON strings."
@@ -94,8 +115,38 @@ def _is_response_format_unsupported(error_message: str) -> bool:
     return "response_format" in lowered or "json_object" in lowered
 
 
+def _prompt_cache_control_enabled() -> bool:
+    value = os.getenv("GPTSAPI_PROMPT_CACHE_CONTROL", "").strip().lower()
+    return value in {"1", "true", "yes", "on"}
+
+
+def _message_content(text: str, cacheable_prefix: str = "") -> Any:
+    """Return message content, tagging the static prefix for provider caching.
+
+    Providers with automatic prefix caching only need the static text to come
+    first, so plain strings are sent unless explicit ``cache_control`` parts
+    are enabled via ``GPTSAPI_PROMPT_CACHE_CONTROL``.
+    """
+    if not _prompt_cache_control_enabled():
+        return text
+    if not cacheable_prefix:
+        cacheable_prefix = text
+    if not text.startswith(cacheable_prefix):
+        return text
+    parts: List[Dict[str, Any]] = [
+        {"type": "text", "text": cacheable_prefix, "cache_control": {"type": "ephemeral"}},
+    ]
+    remainder = text[len(cacheable_prefix):]
+    if remainder:
+        parts.append({"type": "text", "text": remainder})
+    return parts
+
+
+_USER_PROMPT_FORMAT = compile_template(USER_PROMPT_TEMPLATE, "TRANSCRIPT_TEXT")
+
+
 def build_summary_user_prompt(transcript_text: str, deck_text: str | None = None) -> str:
-    prompt = USER_PROMPT_TEMPLATE.replace("{TRANSCRIPT_TEXT}", transcript_text.strip())
+    prompt = render_template(_USER_PROMPT_FORMAT, TRANSCRIPT_TEXT=transcript_text.strip())
     if deck_text and deck_text.strip():
         prompt += f"\nDeck context:\n<<<{deck_text.strip()}>>>"
     return prompt
@@ -108,12 +159,55 @@ def request_chat_completion(
     temperature: float = 0.3,
     max_tokens: int = 1800,
     response_format: Dict[str, Any] | None = None,
+    cacheable_user_prefix: str = "",
+    cache_sampled: bool = False,
+    cache_validate: Optional[Callable[[str], Any]] = None,
+) -> str:
+    def _call() -> str:
+        with LLM_REQUEST_SLOTS:
+            return _send_chat_completion(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=response_format,
+                cacheable_user_prefix=cacheable_user_prefix,
+            )
+
+    # Sampled (temperature > 0) completions are only reused when the caller
+    # opts in, so the response cache never pins one random draw by default.
+    # ``cache_validate`` keeps outputs that fail the caller's checks out of it.
+    cache = get_llm_cache() if temperature <= 0 or cache_sampled else None
+    if cache is None:
+        return _call()
+    key = LLMCache.make_key(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        model=_model_name(),
+        max_tokens=max_tokens,
+        temperature=temperature,
+        response_format=response_format,
+    )
+    return cache.get_or_call(key, _call, cache_validate)
+
+
+def _send_chat_completion(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_format: Dict[str, Any] | None,
+    cacheable_user_prefix: str,
 ) -> str:
+    user_content: Any = user_prompt
+    if cacheable_user_prefix:
+        user_content = _message_content(user_prompt, cacheable_user_prefix)
     payload = {
         "model": _model_name(),
         "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
+            {"role": "system", "content": _message_content(system_prompt)},
+            {"role": "user", "content": user_content},
         ],
         "temperature": temperature,
         "max_tokens": max_tokens,
@@ -126,7 +220,7 @@ def request_chat_completion(
 
     def _send(json_payload: Dict[str, Any]) -> httpx.Response:
         try:
-            return httpx.post(
+            return _HTTP_CLIENT.post(
                 endpoint,
                 headers=_auth_headers(),
                 json=json_payload,
@@ -17,7 +17,9 @@ def duration_to_seconds(duration) -> float:
     return float(seconds) + (float(nanos) / 1_000_000_000.0)
 
 
-@dataclass
+# Jobs are read on every poll and round run; slots keep records compact and
+# attribute access direct.
+@dataclass(slots=True)
 class JobRecord:
     created_at: datetime
     updated_at: datetime
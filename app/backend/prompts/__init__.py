@@ -1 +1,19 @@
 # Prompt modules for coaching rounds.
+from collections import defaultdict
+
+
+def compile_template(template: str, *fields: str) -> str:
+    """Turn a prompt template into a ``str.format`` string.
+
+    Templates embed literal JSON braces, so every brace is escaped and only
+    the named ``{field}`` placeholders are restored as format fields.
+    """
+    compiled = template.replace("{", "{{").replace("}", "}}")
+    for field in fields:
+        compiled = compiled.replace("{{" + field + "}}", "{" + field + "}")
+    return compiled
+
+
+def render_template(compiled: str, **values: str) -> str:
+    """Fill a compiled template in one pass; missing fields render empty."""
+    return compiled.format_map(defaultdict(str, values))
@@ -3,6 +3,7 @@ import os
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Callable, Optional
 
 from google.api_core.client_options import ClientOptions
@@ -106,6 +107,8 @@ def _normalize_batch_results(batch_results: cloud_speech.BatchRecognizeResults)
     segments: list[dict] = []
     words: list[dict] = []
     has_speaker_tags = False
+    to_seconds = duration_to_seconds
+    normalize_speaker = _normalize_speaker_label
 
     for result in batch_results.results:
         if not result.alternatives:
@@ -116,13 +119,23 @@ def _normalize_batch_results(batch_results: cloud_speech.BatchRecognizeResults)
         if transcript:
             full_text_parts.append(transcript)
 
-        alt_words = list(alternative.words or [])
+        alt_words = [
+            {
+                "start": to_seconds(word_info.start_offset),
+                "end": to_seconds(word_info.end_offset),
+                "word": word_info.word,
+                "speaker": normalize_speaker(getattr(word_info, "speaker_label", None)),
+            }
+            for word_info in alternative.words or ()
+        ]
         if alt_words:
-            segment_start = duration_to_seconds(alt_words[0].start_offset)
-            segment_end = duration_to_seconds(alt_words[-1].end_offset)
+            segment_start = alt_words[0]["start"]
+            segment_end = alt_words[-1]["end"]
+            if not has_speaker_tags:
+                has_speaker_tags = any(word["speaker"] for word in alt_words)
         else:
             segment_start = 0.0
-            segment_end = duration_to_seconds(result.result_end_offset)
+            segment_end = to_seconds(result.result_end_offset)
 
         segments.append(
             {
@@ -131,19 +144,7 @@ def _normalize_batch_results(batch_results: cloud_speech.BatchRecognizeResults)
                 "text": transcript,
             }
         )
-
-        for word_info in alt_words:
-            speaker = _normalize_speaker_label(getattr(word_info, "speaker_label", None))
-            if speaker:
-                has_speaker_tags = True
-            words.append(
-                {
-                    "start": duration_to_seconds(word_info.start_offset),
-                    "end": duration_to_seconds(word_info.end_offset),
-                    "word": word_info.word,
-                    "speaker": speaker,
-                }
-            )
+        words.extend(alt_words)
 
     return (
         {
@@ -267,7 +268,10 @@ def _read_results_from_gcs(
     )
 
 
+@lru_cache(maxsize=4)
 def _build_speech_client(location: str) -> speech_v2.SpeechClient:
+    """Return one client per regional endpoint; its gRPC channel is
+    thread-safe and shared by every chunk and job."""
     endpoint = f"{location}-speech.googleapis.com"
     credentials = get_gcp_credentials()
     if credentials is not None:
@@ -0,0 +1,61 @@
+"""Map LLM-reported time ranges back onto the timestamped transcript."""
+
+from __future__ import annotations
+
+import bisect
+import re
+
+from .coaching_input import WordTimestamp
+
+
+WordIndex = tuple[list[float], list[float], list[str]]
+
+_TIME_RANGE_RE = re.compile(r"(\d+):(\d{1,2}(?:\.\d+)?)\s*-\s*(\d+):(\d{1,2}(?:\.\d+)?)")
+_DASH_TABLE = str.maketrans({"\u2013": "-", "\u2014": "-"})
+
+
+def parse_time_range(time_range: str) -> tuple[float, float] | None:
+    """Parse a time range string like '0:00–0:10' or '1:30–2:00' into
+    (start_sec, end_sec).  Returns None if parsing fails."""
+    # Normalise various dash characters
+    tr = time_range.translate(_DASH_TABLE).strip()
+    m = _TIME_RANGE_RE.match(tr)
+    if not m:
+        return None
+    start = int(m.group(1)) * 60 + float(m.group(2))
+    end = int(m.group(3)) * 60 + float(m.group(4))
+    return (start, end)
+
+
+def build_word_index(words: list[WordTimestamp]) -> WordIndex:
+    """Split timestamped words into parallel (starts, ends, texts) lists.
+
+    Words arrive in transcript order, so ``ends`` is sorted and each moment
+    window can be located by binary search instead of rescanning every word.
+    """
+    return (
+        [w.start for w in words],
+        [w.end for w in words],
+        [w.word for w in words],
+    )
+
+
+def extract_sentence_for_window(
+    word_index: WordIndex,
+    start_sec: float,
+    end_sec: float,
+) -> str | None:
+    """Return the transcript text spoken during [start_sec, end_sec].
+
+    Selects all words whose time ranges overlap the window and joins them.
+    If no words overlap, returns None.
+    """
+    starts, ends, texts = word_index
+    # First word ending after the window opens, first word starting at or
+    # after it closes; transcript words are in time order.
+    lo = bisect.bisect_right(ends, start_sec)
+    hi = bisect.bisect_left(starts, end_sec, lo)
+    if hi <= lo:
+        return None
+    text = " ".join(texts[lo:hi]).strip()
+    return text if text else None
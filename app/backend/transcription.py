@@ -86,7 +86,7 @@ def process_deck_asset(
         num_pages_or_slides=None,
     )
 
-    extraction = extract_deck_text(deck_path)
+    extraction = extract_deck_text(deck_path, deck_upload.get("extension"))
     job_store.save_deck_asset(
         job_id,
         filename=deck_upload["filename"],
@@ -232,6 +232,23 @@ def _format_ts(sec: float) -> str:
     return f"{m}:{s:04.1f}"
 
 
+# ---------------------------------------------------------------------------
+# Scratch space for video files
+# ---------------------------------------------------------------------------
+
+def video_scratch_dir() -> Optional[str]:
+    """Directory for temporary video files, or ``None`` for the system default.
+
+    OpenCV can only open videos by path, so downloads and conversions must
+    touch a filesystem.  Point ``VIDEO_SCRATCH_DIR`` at a tmpfs such as
+    ``/dev/shm`` to keep those copies in memory instead of on disk.
+    """
+    scratch = os.getenv("VIDEO_SCRATCH_DIR", "").strip()
+    if scratch and os.path.isdir(scratch):
+        return scratch
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Codec fallback: .webm -> .mp4 via system ffmpeg
 # ---------------------------------------------------------------------------
@@ -248,7 +265,7 @@ def _convert_webm_to_mp4(src: str | Path) -> Optional[Path]:
         logger.warning("ffmpeg not on PATH — cannot convert video for body-language analysis")
         return None
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="bl_conv_"))
+    tmp_dir = Path(tempfile.mkdtemp(prefix="bl_conv_", dir=video_scratch_dir()))
     mp4_path = tmp_dir / "converted.mp4"
 
     cmd = [
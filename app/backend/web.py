@@ -162,6 +162,7 @@ async def _save_deck_upload(job_id: str, deck: UploadFile) -> dict:
         "content_type": deck.content_type,
         "size_bytes": size_bytes,
         "storage_path": str(deck_path),
+        "extension": extension,
     }
 
 